@@ -1,8 +1,12 @@
 __version__ = "0.0.4"
 
+import sys
+
 # Bugfix: fastprogress bars not showing in VSCode notebooks. Taken from https://github.com/microsoft/vscode-jupyter/issues/13163
-import IPython
-def update_patch(self, obj):
-    IPython.display.clear_output(wait=True)
-    self.display(obj)
-IPython.display.DisplayHandle.update = update_patch
\ No newline at end of file
+# Only applied when running under IPython, so that other processes (e.g. serving with `similarity_learning.serving`) don't import it
+if 'IPython' in sys.modules:
+    import IPython
+    def update_patch(self, obj):
+        IPython.display.clear_output(wait=True)
+        self.display(obj)
+    IPython.display.DisplayHandle.update = update_patch
@@ -6,6 +6,133 @@ d = { 'settings': { 'branch': 'main',
                 'git_url': 'https://github.com/Irad-Zehavi/similarity-learning',
                 'lib_path': 'similarity_learning'},
   'syms': { 'similarity_learning.all': {},
+            'similarity_learning.benchmarks': { 'similarity_learning.benchmarks._ThresholdCrossValidation': ( 'benchmarks.html#_thresholdcrossvalidation',
+                                                                                                              'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._ThresholdCrossValidation.iteration': ( 'benchmarks.html#_thresholdcrossvalidation.iteration',
+                                                                                                                        'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._distance': ( 'benchmarks.html#_distance',
+                                                                                              'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._distance_matrix': ( 'benchmarks.html#_distance_matrix',
+                                                                                                     'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._fit_threshold': ( 'benchmarks.html#_fit_threshold',
+                                                                                                   'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._pairs_dl': ( 'benchmarks.html#_pairs_dl',
+                                                                                              'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._repeated_experiment': ( 'benchmarks.html#_repeated_experiment',
+                                                                                                         'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._results_frame': ( 'benchmarks.html#_results_frame',
+                                                                                                   'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._siamese_forward': ( 'benchmarks.html#_siamese_forward',
+                                                                                                     'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._synthetic_pairs': ( 'benchmarks.html#_synthetic_pairs',
+                                                                                                     'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._threshold_fit': ( 'benchmarks.html#_threshold_fit',
+                                                                                                   'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks._time': ( 'benchmarks.html#_time',
+                                                                                          'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks.benchmark': ( 'benchmarks.html#benchmark',
+                                                                                              'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks.benchmark_cli': ( 'benchmarks.html#benchmark_cli',
+                                                                                                  'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks.compare_results': ( 'benchmarks.html#compare_results',
+                                                                                                    'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks.load_results': ( 'benchmarks.html#load_results',
+                                                                                                 'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks.run_benchmarks': ( 'benchmarks.html#run_benchmarks',
+                                                                                                   'similarity_learning/benchmarks.py'),
+                                                'similarity_learning.benchmarks.save_results': ( 'benchmarks.html#save_results',
+                                                                                                 'similarity_learning/benchmarks.py')},
+            'similarity_learning.calibration': { 'similarity_learning.calibration.Calibration': ( 'calibration.html#calibration',
+                                                                                                  'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.__init__': ( 'calibration.html#calibration.__init__',
+                                                                                                           'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration._from_counts': ( 'calibration.html#calibration._from_counts',
+                                                                                                               'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.auc': ( 'calibration.html#calibration.auc',
+                                                                                                      'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.eer': ( 'calibration.html#calibration.eer',
+                                                                                                      'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.far': ( 'calibration.html#calibration.far',
+                                                                                                      'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.forward': ( 'calibration.html#calibration.forward',
+                                                                                                          'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.from_distances': ( 'calibration.html#calibration.from_distances',
+                                                                                                                 'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.from_histogram': ( 'calibration.html#calibration.from_histogram',
+                                                                                                                 'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.frr': ( 'calibration.html#calibration.frr',
+                                                                                                      'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.n_neg': ( 'calibration.html#calibration.n_neg',
+                                                                                                        'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.n_pos': ( 'calibration.html#calibration.n_pos',
+                                                                                                        'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.plot_roc': ( 'calibration.html#calibration.plot_roc',
+                                                                                                           'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.tar': ( 'calibration.html#calibration.tar',
+                                                                                                      'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.tar_at_far': ( 'calibration.html#calibration.tar_at_far',
+                                                                                                             'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.threshold_at_far': ( 'calibration.html#calibration.threshold_at_far',
+                                                                                                                   'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.Calibration.threshold_at_frr': ( 'calibration.html#calibration.threshold_at_frr',
+                                                                                                                   'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration.ThresholdSiamese.calibrate': ( 'calibration.html#thresholdsiamese.calibrate',
+                                                                                                                 'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration._compressed_cuts': ( 'calibration.html#_compressed_cuts',
+                                                                                                       'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration._fit_isotonic': ( 'calibration.html#_fit_isotonic',
+                                                                                                    'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration._fit_platt': ( 'calibration.html#_fit_platt',
+                                                                                                 'similarity_learning/calibration.py'),
+                                                 'similarity_learning.calibration._interp': ( 'calibration.html#_interp',
+                                                                                              'similarity_learning/calibration.py')},
+            'similarity_learning.core': { 'similarity_learning.core.NormalizedSquaredEuclideanDistance': ( 'core.html#normalizedsquaredeuclideandistance',
+                                                                                                           'similarity_learning/core.py'),
+                                          'similarity_learning.core.NormalizedSquaredEuclideanDistance.forward': ( 'core.html#normalizedsquaredeuclideandistance.forward',
+                                                                                                                   'similarity_learning/core.py'),
+                                          'similarity_learning.core.Threshold': ('core.html#threshold', 'similarity_learning/core.py'),
+                                          'similarity_learning.core.Threshold.__init__': ( 'core.html#threshold.__init__',
+                                                                                           'similarity_learning/core.py'),
+                                          'similarity_learning.core.Threshold.forward': ( 'core.html#threshold.forward',
+                                                                                          'similarity_learning/core.py'),
+                                          'similarity_learning.core._DistanceMetric': ( 'core.html#_distancemetric',
+                                                                                        'similarity_learning/core.py'),
+                                          'similarity_learning.core._DistanceMetric.__init__': ( 'core.html#_distancemetric.__init__',
+                                                                                                 'similarity_learning/core.py'),
+                                          'similarity_learning.core._DistanceMetric.forward': ( 'core.html#_distancemetric.forward',
+                                                                                                'similarity_learning/core.py'),
+                                          'similarity_learning.core.distance_metric_module': ( 'core.html#distance_metric_module',
+                                                                                               'similarity_learning/core.py'),
+                                          'similarity_learning.core.normalized_squared_euclidean_distance': ( 'core.html#normalized_squared_euclidean_distance',
+                                                                                                              'similarity_learning/core.py')},
+            'similarity_learning.embedding_cache': { 'similarity_learning.embedding_cache.DistanceSiamese.cache_embeddings': ( 'embedding_cache.html#distancesiamese.cache_embeddings',
+                                                                                                                               'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache': ( 'embedding_cache.html#embeddingcache',
+                                                                                                             'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache.__call__': ( 'embedding_cache.html#embeddingcache.__call__',
+                                                                                                                      'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache.__init__': ( 'embedding_cache.html#embeddingcache.__init__',
+                                                                                                                      'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache.__len__': ( 'embedding_cache.html#embeddingcache.__len__',
+                                                                                                                     'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache._allocate': ( 'embedding_cache.html#embeddingcache._allocate',
+                                                                                                                       'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache._free_slot': ( 'embedding_cache.html#embeddingcache._free_slot',
+                                                                                                                        'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache.add': ( 'embedding_cache.html#embeddingcache.add',
+                                                                                                                 'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.EmbeddingCache.clear': ( 'embedding_cache.html#embeddingcache.clear',
+                                                                                                                   'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.InvalidateEmbeddingCaches': ( 'embedding_cache.html#invalidateembeddingcaches',
+                                                                                                                        'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.InvalidateEmbeddingCaches.after_step': ( 'embedding_cache.html#invalidateembeddingcaches.after_step',
+                                                                                                                                   'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.ThresholdSiamese.cache_embeddings': ( 'embedding_cache.html#thresholdsiamese.cache_embeddings',
+                                                                                                                                'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache._weights_version': ( 'embedding_cache.html#_weights_version',
+                                                                                                               'similarity_learning/embedding_cache.py'),
+                                                     'similarity_learning.embedding_cache.content_hash': ( 'embedding_cache.html#content_hash',
+                                                                                                           'similarity_learning/embedding_cache.py')},
             'similarity_learning.facenet': { 'similarity_learning.facenet.FaceNetInceptionResnetV1': ( 'facenet.html#facenetinceptionresnetv1',
                                                                                                        'similarity_learning/facenet.py'),
                                              'similarity_learning.facenet.FaceNetInceptionResnetV1.__init__': ( 'facenet.html#facenetinceptionresnetv1.__init__',
@@ -16,8 +143,144 @@ d = { 'settings': { 'branch': 'main',
                                                                                       'similarity_learning/facenet.py')},
             'similarity_learning.feature_space_plotting': { 'similarity_learning.feature_space_plotting._plot_cluster': ( 'feature_space_plotting.html#_plot_cluster',
                                                                                                                           'similarity_learning/feature_space_plotting.py'),
+                                                            'similarity_learning.feature_space_plotting._rp_tree_leaves': ( 'feature_space_plotting.html#_rp_tree_leaves',
+                                                                                                                            'similarity_learning/feature_space_plotting.py'),
+                                                            'similarity_learning.feature_space_plotting.approximate_neighbors': ( 'feature_space_plotting.html#approximate_neighbors',
+                                                                                                                                  'similarity_learning/feature_space_plotting.py'),
+                                                            'similarity_learning.feature_space_plotting.neighbor_layout': ( 'feature_space_plotting.html#neighbor_layout',
+                                                                                                                            'similarity_learning/feature_space_plotting.py'),
                                                             'similarity_learning.feature_space_plotting.plot_dataset_embedding': ( 'feature_space_plotting.html#plot_dataset_embedding',
-                                                                                                                                   'similarity_learning/feature_space_plotting.py')},
+                                                                                                                                   'similarity_learning/feature_space_plotting.py'),
+                                                            'similarity_learning.feature_space_plotting.randomized_pca': ( 'feature_space_plotting.html#randomized_pca',
+                                                                                                                           'similarity_learning/feature_space_plotting.py')},
+            'similarity_learning.identification': { 'similarity_learning.identification.FlatIndex': ( 'identification.html#flatindex',
+                                                                                                      'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.__init__': ( 'identification.html#flatindex.__init__',
+                                                                                                               'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.__len__': ( 'identification.html#flatindex.__len__',
+                                                                                                              'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex._new_ids': ( 'identification.html#flatindex._new_ids',
+                                                                                                               'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex._state': ( 'identification.html#flatindex._state',
+                                                                                                             'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.add': ( 'identification.html#flatindex.add',
+                                                                                                          'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.load': ( 'identification.html#flatindex.load',
+                                                                                                           'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.range_search': ( 'identification.html#flatindex.range_search',
+                                                                                                                   'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.remove': ( 'identification.html#flatindex.remove',
+                                                                                                             'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.save': ( 'identification.html#flatindex.save',
+                                                                                                           'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.FlatIndex.search': ( 'identification.html#flatindex.search',
+                                                                                                             'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex': ( 'identification.html#ivfindex',
+                                                                                                     'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex.__init__': ( 'identification.html#ivfindex.__init__',
+                                                                                                              'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex._nearest_lists': ( 'identification.html#ivfindex._nearest_lists',
+                                                                                                                    'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex._probed': ( 'identification.html#ivfindex._probed',
+                                                                                                             'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex._state': ( 'identification.html#ivfindex._state',
+                                                                                                            'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex.add': ( 'identification.html#ivfindex.add',
+                                                                                                         'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex.range_search': ( 'identification.html#ivfindex.range_search',
+                                                                                                                  'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex.remove': ( 'identification.html#ivfindex.remove',
+                                                                                                            'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex.search': ( 'identification.html#ivfindex.search',
+                                                                                                            'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.IVFIndex.train': ( 'identification.html#ivfindex.train',
+                                                                                                           'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.ThresholdSiamese.identify': ( 'identification.html#thresholdsiamese.identify',
+                                                                                                                      'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification._metric_name': ( 'identification.html#_metric_name',
+                                                                                                         'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification._no_neighbors': ( 'identification.html#_no_neighbors',
+                                                                                                          'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification._within_radius': ( 'identification.html#_within_radius',
+                                                                                                           'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.benchmark_index': ( 'identification.html#benchmark_index',
+                                                                                                            'similarity_learning/identification.py'),
+                                                    'similarity_learning.identification.kmeans': ( 'identification.html#kmeans',
+                                                                                                   'similarity_learning/identification.py')},
+            'similarity_learning.inference': { 'similarity_learning.inference.Autocast': ( 'inference.html#autocast',
+                                                                                           'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.Autocast.__init__': ( 'inference.html#autocast.__init__',
+                                                                                                    'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.Autocast.forward': ( 'inference.html#autocast.forward',
+                                                                                                   'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.ThresholdSiamese.autocasted': ( 'inference.html#thresholdsiamese.autocasted',
+                                                                                                              'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.ThresholdSiamese.for_inference': ( 'inference.html#thresholdsiamese.for_inference',
+                                                                                                                 'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.ThresholdSiamese.quantized': ( 'inference.html#thresholdsiamese.quantized',
+                                                                                                             'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.benchmark_latency': ( 'inference.html#benchmark_latency',
+                                                                                                    'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.model_size': ( 'inference.html#model_size',
+                                                                                             'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.precision_report': ( 'inference.html#precision_report',
+                                                                                                   'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.to_onnx': ( 'inference.html#to_onnx',
+                                                                                          'similarity_learning/inference.py'),
+                                               'similarity_learning.inference.to_torchscript': ( 'inference.html#to_torchscript',
+                                                                                                 'similarity_learning/inference.py')},
+            'similarity_learning.mining': { 'similarity_learning.mining.BatchHardTripletLoss': ( 'mining.html#batchhardtripletloss',
+                                                                                                 'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.BatchHardTripletLoss.__init__': ( 'mining.html#batchhardtripletloss.__init__',
+                                                                                                          'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.BatchHardTripletLoss.forward': ( 'mining.html#batchhardtripletloss.forward',
+                                                                                                         'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.ClassBalancedDL': ( 'mining.html#classbalanceddl',
+                                                                                            'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.ClassBalancedDL.__init__': ( 'mining.html#classbalanceddl.__init__',
+                                                                                                     'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.ClassBalancedDL.get_idxs': ( 'mining.html#classbalanceddl.get_idxs',
+                                                                                                     'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.ClassBalancedDL.new': ( 'mining.html#classbalanceddl.new',
+                                                                                                'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.Datasets.class_balanced_dls': ( 'mining.html#datasets.class_balanced_dls',
+                                                                                                        'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.InBatchPairs': ( 'mining.html#inbatchpairs',
+                                                                                         'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.InBatchPairs.__init__': ( 'mining.html#inbatchpairs.__init__',
+                                                                                                  'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.InBatchPairs.forward': ( 'mining.html#inbatchpairs.forward',
+                                                                                                 'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.InfoNCELoss': ( 'mining.html#infonceloss',
+                                                                                        'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.InfoNCELoss.__init__': ( 'mining.html#infonceloss.__init__',
+                                                                                                 'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.InfoNCELoss.forward': ( 'mining.html#infonceloss.forward',
+                                                                                                'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.MinedContrastiveLoss': ( 'mining.html#minedcontrastiveloss',
+                                                                                                 'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.MinedContrastiveLoss.__init__': ( 'mining.html#minedcontrastiveloss.__init__',
+                                                                                                          'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.MinedContrastiveLoss.forward': ( 'mining.html#minedcontrastiveloss.forward',
+                                                                                                         'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.MinedContrastiveLoss.mine': ( 'mining.html#minedcontrastiveloss.mine',
+                                                                                                      'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.MultiSimilarityLoss': ( 'mining.html#multisimilarityloss',
+                                                                                                'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.MultiSimilarityLoss.__init__': ( 'mining.html#multisimilarityloss.__init__',
+                                                                                                         'similarity_learning/mining.py'),
+                                            'similarity_learning.mining.MultiSimilarityLoss.forward': ( 'mining.html#multisimilarityloss.forward',
+                                                                                                        'similarity_learning/mining.py'),
+                                            'similarity_learning.mining._all_pairs': ( 'mining.html#_all_pairs',
+                                                                                       'similarity_learning/mining.py'),
+                                            'similarity_learning.mining._hard_pairs': ( 'mining.html#_hard_pairs',
+                                                                                        'similarity_learning/mining.py'),
+                                            'similarity_learning.mining._masked_softplus_logsumexp': ( 'mining.html#_masked_softplus_logsumexp',
+                                                                                                       'similarity_learning/mining.py'),
+                                            'similarity_learning.mining._pair_masks': ( 'mining.html#_pair_masks',
+                                                                                        'similarity_learning/mining.py'),
+                                            'similarity_learning.mining._semi_hard_pairs': ( 'mining.html#_semi_hard_pairs',
+                                                                                             'similarity_learning/mining.py')},
             'similarity_learning.pair_matching': { 'similarity_learning.pair_matching.ThresholdSiamese': ( 'pair_matching.html#thresholdsiamese',
                                                                                                            'similarity_learning/pair_matching.py'),
                                                    'similarity_learning.pair_matching.ThresholdSiamese.__init__': ( 'pair_matching.html#thresholdsiamese.__init__',
@@ -26,8 +289,120 @@ d = { 'settings': { 'branch': 'main',
                                                                                                                          'similarity_learning/pair_matching.py'),
                                                    'similarity_learning.pair_matching.ThresholdSiamese.forward': ( 'pair_matching.html#thresholdsiamese.forward',
                                                                                                                    'similarity_learning/pair_matching.py'),
+                                                   'similarity_learning.pair_matching.ThresholdSiamese.match': ( 'pair_matching.html#thresholdsiamese.match',
+                                                                                                                 'similarity_learning/pair_matching.py'),
                                                    'similarity_learning.pair_matching.ThresholdSiamese.plot_distance_histogram': ( 'pair_matching.html#thresholdsiamese.plot_distance_histogram',
                                                                                                                                    'similarity_learning/pair_matching.py')},
+            'similarity_learning.profiling': { 'similarity_learning.profiling.ProfileCallback': ( 'profiling.html#profilecallback',
+                                                                                                  'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.__init__': ( 'profiling.html#profilecallback.__init__',
+                                                                                                           'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback._lap': ( 'profiling.html#profilecallback._lap',
+                                                                                                       'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback._start': ( 'profiling.html#profilecallback._start',
+                                                                                                         'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback._stop': ( 'profiling.html#profilecallback._stop',
+                                                                                                        'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.after_backward': ( 'profiling.html#profilecallback.after_backward',
+                                                                                                                 'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.after_batch': ( 'profiling.html#profilecallback.after_batch',
+                                                                                                              'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.after_epoch': ( 'profiling.html#profilecallback.after_epoch',
+                                                                                                              'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.after_fit': ( 'profiling.html#profilecallback.after_fit',
+                                                                                                            'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.after_loss': ( 'profiling.html#profilecallback.after_loss',
+                                                                                                             'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.after_pred': ( 'profiling.html#profilecallback.after_pred',
+                                                                                                             'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.after_step': ( 'profiling.html#profilecallback.after_step',
+                                                                                                             'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.before_batch': ( 'profiling.html#profilecallback.before_batch',
+                                                                                                               'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.before_epoch': ( 'profiling.html#profilecallback.before_epoch',
+                                                                                                               'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.before_fit': ( 'profiling.html#profilecallback.before_fit',
+                                                                                                             'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.before_train': ( 'profiling.html#profilecallback.before_train',
+                                                                                                               'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.ProfileCallback.before_validate': ( 'profiling.html#profilecallback.before_validate',
+                                                                                                                  'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.Profiler': ( 'profiling.html#profiler',
+                                                                                           'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.Profiler.__init__': ( 'profiling.html#profiler.__init__',
+                                                                                                    'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.Profiler.add': ( 'profiling.html#profiler.add',
+                                                                                               'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.Profiler.stats': ( 'profiling.html#profiler.stats',
+                                                                                                 'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._MemoryMonitor': ( 'profiling.html#_memorymonitor',
+                                                                                                 'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._MemoryMonitor.__enter__': ( 'profiling.html#_memorymonitor.__enter__',
+                                                                                                           'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._MemoryMonitor.__exit__': ( 'profiling.html#_memorymonitor.__exit__',
+                                                                                                          'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._MemoryMonitor.__init__': ( 'profiling.html#_memorymonitor.__init__',
+                                                                                                          'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._MemoryMonitor._sample': ( 'profiling.html#_memorymonitor._sample',
+                                                                                                         'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._active_profilers': ( 'profiling.html#_active_profilers',
+                                                                                                    'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._max_resident_memory': ( 'profiling.html#_max_resident_memory',
+                                                                                                       'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._resident_memory': ( 'profiling.html#_resident_memory',
+                                                                                                   'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling._synchronize': ( 'profiling.html#_synchronize',
+                                                                                               'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.add_time': ( 'profiling.html#add_time',
+                                                                                           'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.count': ( 'profiling.html#count',
+                                                                                        'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.profiled': ( 'profiling.html#profiled',
+                                                                                           'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.profiling': ( 'profiling.html#profiling',
+                                                                                            'similarity_learning/profiling.py'),
+                                               'similarity_learning.profiling.record': ( 'profiling.html#record',
+                                                                                         'similarity_learning/profiling.py')},
+            'similarity_learning.serving': { 'similarity_learning.serving.InferenceSiamese': ( 'serving.html#inferencesiamese',
+                                                                                               'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.InferenceSiamese.__init__': ( 'serving.html#inferencesiamese.__init__',
+                                                                                                        'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.InferenceSiamese.forward': ( 'serving.html#inferencesiamese.forward',
+                                                                                                       'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.MicroBatcher': ( 'serving.html#microbatcher',
+                                                                                           'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.MicroBatcher.__aenter__': ( 'serving.html#microbatcher.__aenter__',
+                                                                                                      'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.MicroBatcher.__aexit__': ( 'serving.html#microbatcher.__aexit__',
+                                                                                                     'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.MicroBatcher.__init__': ( 'serving.html#microbatcher.__init__',
+                                                                                                    'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.MicroBatcher._next_batch': ( 'serving.html#microbatcher._next_batch',
+                                                                                                       'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.MicroBatcher._run': ( 'serving.html#microbatcher._run',
+                                                                                                'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.MicroBatcher.submit': ( 'serving.html#microbatcher.submit',
+                                                                                                  'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService': ( 'serving.html#verificationservice',
+                                                                                                  'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService.__aenter__': ( 'serving.html#verificationservice.__aenter__',
+                                                                                                             'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService.__aexit__': ( 'serving.html#verificationservice.__aexit__',
+                                                                                                            'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService.__init__': ( 'serving.html#verificationservice.__init__',
+                                                                                                           'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService.embed': ( 'serving.html#verificationservice.embed',
+                                                                                                        'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService.enroll': ( 'serving.html#verificationservice.enroll',
+                                                                                                         'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService.verify': ( 'serving.html#verificationservice.verify',
+                                                                                                         'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.VerificationService.verify_probe': ( 'serving.html#verificationservice.verify_probe',
+                                                                                                               'similarity_learning/serving.py'),
+                                             'similarity_learning.serving._embed_batch': ( 'serving.html#_embed_batch',
+                                                                                           'similarity_learning/serving.py'),
+                                             'similarity_learning.serving.generate_load': ( 'serving.html#generate_load',
+                                                                                            'similarity_learning/serving.py')},
             'similarity_learning.siamese': { 'similarity_learning.siamese.ContrastiveLoss': ( 'siamese.html#contrastiveloss',
                                                                                               'similarity_learning/siamese.py'),
                                              'similarity_learning.siamese.ContrastiveLoss.__call__': ( 'siamese.html#contrastiveloss.__call__',
@@ -38,16 +413,58 @@ d = { 'settings': { 'branch': 'main',
                                                                                               'similarity_learning/siamese.py'),
                                              'similarity_learning.siamese.DistanceSiamese.__init__': ( 'siamese.html#distancesiamese.__init__',
                                                                                                        'similarity_learning/siamese.py'),
+                                             'similarity_learning.siamese.DistanceSiamese._has_batch_norm': ( 'siamese.html#distancesiamese._has_batch_norm',
+                                                                                                              'similarity_learning/siamese.py'),
                                              'similarity_learning.siamese.DistanceSiamese._hist': ( 'siamese.html#distancesiamese._hist',
                                                                                                     'similarity_learning/siamese.py'),
+                                             'similarity_learning.siamese.DistanceSiamese.collect_distances': ( 'siamese.html#distancesiamese.collect_distances',
+                                                                                                                'similarity_learning/siamese.py'),
+                                             'similarity_learning.siamese.DistanceSiamese.distance_matrix': ( 'siamese.html#distancesiamese.distance_matrix',
+                                                                                                              'similarity_learning/siamese.py'),
+                                             'similarity_learning.siamese.DistanceSiamese.embed': ( 'siamese.html#distancesiamese.embed',
+                                                                                                    'similarity_learning/siamese.py'),
+                                             'similarity_learning.siamese.DistanceSiamese.embed_all': ( 'siamese.html#distancesiamese.embed_all',
+                                                                                                        'similarity_learning/siamese.py'),
                                              'similarity_learning.siamese.DistanceSiamese.forward': ( 'siamese.html#distancesiamese.forward',
                                                                                                       'similarity_learning/siamese.py'),
                                              'similarity_learning.siamese.DistanceSiamese.plot_distance_histogram': ( 'siamese.html#distancesiamese.plot_distance_histogram',
                                                                                                                       'similarity_learning/siamese.py'),
-                                             'similarity_learning.siamese.normalized_squared_euclidean_distance': ( 'siamese.html#normalized_squared_euclidean_distance',
-                                                                                                                    'similarity_learning/siamese.py')},
-            'similarity_learning.utils': { 'similarity_learning.utils.ExperimentalResults': ( 'utils.html#experimentalresults',
+                                             'similarity_learning.siamese._broadcast_matrix_form': ( 'siamese.html#_broadcast_matrix_form',
+                                                                                                     'similarity_learning/siamese.py'),
+                                             'similarity_learning.siamese.normalized_squared_euclidean_distance_matrix': ( 'siamese.html#normalized_squared_euclidean_distance_matrix',
+                                                                                                                           'similarity_learning/siamese.py'),
+                                             'similarity_learning.siamese.tiled_distance_matrix': ( 'siamese.html#tiled_distance_matrix',
+                                                                                                    'similarity_learning/siamese.py')},
+            'similarity_learning.utils': { 'similarity_learning.utils.DistanceBuffer': ( 'utils.html#distancebuffer',
+                                                                                         'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceBuffer.__init__': ( 'utils.html#distancebuffer.__init__',
+                                                                                                  'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceBuffer.__len__': ( 'utils.html#distancebuffer.__len__',
+                                                                                                 'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceBuffer._allocate': ( 'utils.html#distancebuffer._allocate',
+                                                                                                   'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceBuffer.distances': ( 'utils.html#distancebuffer.distances',
+                                                                                                   'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceBuffer.histogram': ( 'utils.html#distancebuffer.histogram',
+                                                                                                   'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceBuffer.targets': ( 'utils.html#distancebuffer.targets',
+                                                                                                 'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceBuffer.update': ( 'utils.html#distancebuffer.update',
+                                                                                                'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceHistogram': ( 'utils.html#distancehistogram',
+                                                                                            'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceHistogram.__init__': ( 'utils.html#distancehistogram.__init__',
+                                                                                                     'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceHistogram.cumulative_counts': ( 'utils.html#distancehistogram.cumulative_counts',
+                                                                                                              'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceHistogram.totals': ( 'utils.html#distancehistogram.totals',
+                                                                                                   'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.DistanceHistogram.update': ( 'utils.html#distancehistogram.update',
+                                                                                                   'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.ExperimentalResults': ( 'utils.html#experimentalresults',
                                                                                               'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.ExperimentalResults.__post_init__': ( 'utils.html#experimentalresults.__post_init__',
+                                                                                                            'similarity_learning/utils.py'),
                                            'similarity_learning.utils.ExperimentalResults.collated_stats': ( 'utils.html#experimentalresults.collated_stats',
                                                                                                              'similarity_learning/utils.py'),
                                            'similarity_learning.utils.ExperimentalResults.plot_stats': ( 'utils.html#experimentalresults.plot_stats',
@@ -65,20 +482,43 @@ d = { 'settings': { 'branch': 'main',
                                                                                              'similarity_learning/utils.py'),
                                            'similarity_learning.utils.RepeatedExperiment.__init__': ( 'utils.html#repeatedexperiment.__init__',
                                                                                                       'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.RepeatedExperiment._precomputed_features': ( 'utils.html#repeatedexperiment._precomputed_features',
+                                                                                                                   'similarity_learning/utils.py'),
                                            'similarity_learning.utils.RepeatedExperiment._run': ( 'utils.html#repeatedexperiment._run',
                                                                                                   'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.RepeatedExperiment._run_iterations': ( 'utils.html#repeatedexperiment._run_iterations',
+                                                                                                             'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.RepeatedExperiment._try_iteration': ( 'utils.html#repeatedexperiment._try_iteration',
+                                                                                                            'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.RepeatedExperiment._try_iteration_on_copy': ( 'utils.html#repeatedexperiment._try_iteration_on_copy',
+                                                                                                                    'similarity_learning/utils.py'),
                                            'similarity_learning.utils.RepeatedExperiment.iteration': ( 'utils.html#repeatedexperiment.iteration',
                                                                                                        'similarity_learning/utils.py'),
                                            'similarity_learning.utils.RepeatedExperiment.run': ( 'utils.html#repeatedexperiment.run',
                                                                                                  'similarity_learning/utils.py'),
-                                           'similarity_learning.utils.Threshold': ('utils.html#threshold', 'similarity_learning/utils.py'),
-                                           'similarity_learning.utils.Threshold.__init__': ( 'utils.html#threshold.__init__',
-                                                                                             'similarity_learning/utils.py'),
                                            'similarity_learning.utils.Threshold.fit': ( 'utils.html#threshold.fit',
                                                                                         'similarity_learning/utils.py'),
-                                           'similarity_learning.utils.Threshold.forward': ( 'utils.html#threshold.forward',
-                                                                                            'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.Threshold.fit_histogram': ( 'utils.html#threshold.fit_histogram',
+                                                                                                  'similarity_learning/utils.py'),
+                                           'similarity_learning.utils._best_cut': ('utils.html#_best_cut', 'similarity_learning/utils.py'),
+                                           'similarity_learning.utils._inputs': ('utils.html#_inputs', 'similarity_learning/utils.py'),
+                                           'similarity_learning.utils._replaced_module': ( 'utils.html#_replaced_module',
+                                                                                           'similarity_learning/utils.py'),
+                                           'similarity_learning.utils._same_items': ( 'utils.html#_same_items',
+                                                                                      'similarity_learning/utils.py'),
+                                           'similarity_learning.utils._try_forked_iteration': ( 'utils.html#_try_forked_iteration',
+                                                                                                'similarity_learning/utils.py'),
                                            'similarity_learning.utils.as_percentage': ( 'utils.html#as_percentage',
                                                                                         'similarity_learning/utils.py'),
                                            'similarity_learning.utils.cut_model_by_name': ( 'utils.html#cut_model_by_name',
-                                                                                            'similarity_learning/utils.py')}}}
+                                                                                            'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.features_dsets': ( 'utils.html#features_dsets',
+                                                                                         'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.load_features': ( 'utils.html#load_features',
+                                                                                        'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.pair_features_dsets': ( 'utils.html#pair_features_dsets',
+                                                                                              'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.precompute_features': ( 'utils.html#precompute_features',
+                                                                                              'similarity_learning/utils.py'),
+                                           'similarity_learning.utils.sorted_cuts': ( 'utils.html#sorted_cuts',
+                                                                                      'similarity_learning/utils.py')}}}
@@ -1,7 +1,15 @@
 from fastai_datasets.all import *
 
 from .siamese import *
+from .calibration import *
+from .core import *
 from .facenet import *
 from .feature_space_plotting import *
 from .pair_matching import *
+from .embedding_cache import *
+from .identification import *
+from .inference import *
+from .mining import *
+from .profiling import *
+from .serving import *
 from .utils import *
\ No newline at end of file
@@ -0,0 +1,185 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/benchmarks.ipynb.
+
+# %% auto 0
+__all__ = ['benchmark', 'run_benchmarks', 'save_results', 'load_results', 'compare_results', 'benchmark_cli']
+
+# %% ../nbs/benchmarks.ipynb 4
+import json
+import platform
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import torch
+from torch import nn
+from fastai.vision.all import *
+from fastcore.script import call_parse
+
+from .core import *
+from .utils import *
+from .siamese import *
+from .pair_matching import *
+from .facenet import facenet
+from .profiling import profiling
+
+# %% ../nbs/benchmarks.ipynb 5
+_benchmarks = {}
+
+def benchmark(ns: List[int],  # Default numbers of items to benchmark with
+              ds: List[int] = (None,),  # Default embedding dimensions to benchmark with (`None` if it doesn't apply)
+              unit='pairs'):
+    """Registers a benchmark: a function of `(n, d)` that sets up synthetic data, and returns a function running the benchmarked code once.
+    The benchmark is named after the function, without leading underscores (so setups can be private)"""
+    def register(setup: Callable[[int, int], Callable[[], Any]]):
+        _benchmarks[setup.__name__.lstrip('_')] = dict(setup=setup, ns=list(ns), ds=list(ds), unit=unit)
+        return setup
+    return register
+
+# %% ../nbs/benchmarks.ipynb 6
+def _synthetic_pairs(n, d):
+    """Random embedding pairs, with the first half of the pairs matching (their sides are close)"""
+    x1 = torch.randn(n, d)
+    x2 = torch.randn(n, d)
+    x2[:n//2] = x1[:n//2] + .5 * torch.randn(n//2, d)
+    y = torch.arange(n) < n//2
+    return x1, x2, y
+
+
+def _pairs_dl(x1, x2, y, bs=1024):
+    return TfmdDL([((a, b), int(t)) for a, b, t in zip(x1, x2, y)], bs=bs, device='cpu')
+
+
+@benchmark(ns=[10_000, 100_000, 1_000_000], unit='distances')
+def _threshold_fit(n, d):
+    distances, targets = torch.rand(n) * 4, torch.rand(n) < .5
+    return lambda: Threshold().fit(distances, targets)
+
+
+@benchmark(ns=[10_000, 100_000], ds=[128, 512])
+def _distance(n, d):
+    x1, x2, _ = _synthetic_pairs(n, d)
+    return lambda: normalized_squared_euclidean_distance(x1, x2)
+
+
+@benchmark(ns=[1_000, 4_000], ds=[128, 512], unit='distances')
+def _distance_matrix(n, d):
+    x1, x2 = torch.randn(n, d), torch.randn(n, d)
+    return lambda: tiled_distance_matrix(x1, x2)
+
+
+@benchmark(ns=[8, 32])
+def _siamese_forward(n, d):
+    siamese = facenet(pretrained=False).distance.eval()
+    pair = torch.rand(n, 3, 160, 160), torch.rand(n, 3, 160, 160)
+    def run():
+        with torch.no_grad():
+            return siamese(pair)
+    return run
+
+
+@benchmark(ns=[10_000, 100_000], ds=[128])
+def _fit_threshold(n, d):
+    x1, x2, y = _synthetic_pairs(n, d)
+    model, dl = ThresholdSiamese(nn.Identity()), _pairs_dl(x1, x2, y)
+    return lambda: model.fit_threshold(dl)
+
+
+class _ThresholdCrossValidation(RepeatedExperiment):
+    def iteration(self):
+        self.model.fit_threshold(self.dls.train)
+        return dict(zip(['loss', 'accuracy'], Learner(self.dls, self.model, CrossEntropyLossFlat(), metrics=accuracy).validate()))
+
+
+@benchmark(ns=[1_000, 10_000], ds=[128])
+def _repeated_experiment(n, d):
+    """10-fold cross validation of fitting a threshold, as in the LFW protocol"""
+    x1, x2, y = _synthetic_pairs(n, d)
+    items = list(range(n))
+    folds = [Datasets(items, [lambda i: fastuple(x1[i], x2[i]), lambda i: int(y[i])], splits=[[j for j in items if j % 10 != k], list(range(k, n, 10))])
+             for k in range(10)]
+    model = ThresholdSiamese(nn.Identity())
+    def run():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return _ThresholdCrossValidation(model, folds).run()
+    return run
+
+# %% ../nbs/benchmarks.ipynb 8
+def _time(run, n_repeats):
+    run()  # warmup
+    times = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def run_benchmarks(names: List[str] = None,  # Benchmarks to run (all by default)
+                   sizes: Dict[str, List[tuple]] = None,  # Overrides the `(n, d)` grid of some benchmarks, by name
+                   n_repeats=3,  # The median time over this many runs is reported
+                   seed=0) -> dict:
+    """Runs benchmarks, returning their results (throughput, median time and peak memory increase while running for each size) and the environment they ran in"""
+    sizes = sizes or {}
+    results = []
+    for name in names or list(_benchmarks):
+        bench = _benchmarks[name]
+        for n, d in sizes.get(name) or [(n, d) for n in bench['ns'] for d in bench['ds']]:
+            torch.manual_seed(seed)
+            run = bench['setup'](n, d)
+            with profiling() as profiler:  # peak memory is measured over the memory in use after the setup
+                seconds = _time(run, n_repeats)
+            del run
+            results.append({'benchmark': name, 'n': n, 'd': d, 'seconds': seconds,
+                            'throughput': n / seconds, 'unit': bench['unit'],
+                            'peak memory (MB)': profiler.peak_memory / 2**20})
+    environment = {'python': platform.python_version(), 'torch': torch.__version__, 'platform': platform.platform(),
+                   'processor': platform.processor(), 'threads': torch.get_num_threads()}
+    return {'environment': environment, 'results': results}
+
+
+def save_results(results: dict, path):
+    """Saves benchmark results (e.g. as a baseline) to a JSON file"""
+    Path(path).write_text(json.dumps(results, indent=1))
+
+
+def load_results(path) -> dict:
+    return json.loads(Path(path).read_text())
+
+# %% ../nbs/benchmarks.ipynb 10
+def _results_frame(results):
+    return pd.DataFrame(results['results']).astype({'d': 'Int64'}).set_index(['benchmark', 'n', 'd'])
+
+
+def compare_results(results: dict,
+                    baseline: dict,
+                    tolerance=.2,  # Relative slowdown (or increase of peak memory) that's considered a regression
+                    min_memory_increase=16  # Increases of peak memory smaller than this many MB are considered noise
+                    ) -> pd.DataFrame:
+    """Compares the throughput and peak memory of `results` to `baseline` (for the sizes both include), flagging regressions"""
+    current, base = _results_frame(results), _results_frame(baseline)
+    report = pd.DataFrame({'baseline throughput': base['throughput'], 'throughput': current['throughput'],
+                           'baseline peak memory (MB)': base['peak memory (MB)'], 'peak memory (MB)': current['peak memory (MB)']}).dropna()
+    report['speedup'] = report['throughput'] / report['baseline throughput']
+    memory_increase = report['peak memory (MB)'] - report['baseline peak memory (MB)']
+    report['regression'] = (report['speedup'] < 1 - tolerance) | ((memory_increase > tolerance * report['baseline peak memory (MB)']) & (memory_increase > min_memory_increase))
+    return report
+
+# %% ../nbs/benchmarks.ipynb 18
+@call_parse
+def benchmark_cli(save: str = None,  # Path to save the results to, e.g. as a new baseline
+                  baseline: str = None,  # Path of baseline results to compare to
+                  tolerance: float = .2,  # Relative slowdown (or increase of peak memory) that's considered a regression
+                  names: str = None,  # Comma-separated names of benchmarks to run (all by default)
+                  n_repeats: int = 3):
+    "Runs the benchmarks, optionally saving the results and comparing them to a baseline (exiting with an error on regressions)"
+    results = run_benchmarks(names.split(',') if names else None, n_repeats=n_repeats)
+    if save:
+        save_results(results, save)
+    if not baseline:
+        print(_results_frame(results).to_string())
+        return
+    report = compare_results(results, load_results(baseline), tolerance)
+    print(report.to_string())
+    if report['regression'].any():
+        raise SystemExit(f'Performance regressions in: {", ".join(map(str, report.index[report["regression"]]))}')
@@ -0,0 +1,241 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/calibration.ipynb.
+
+# %% auto 0
+__all__ = ['Calibration']
+
+# %% ../nbs/calibration.ipynb 4
+from typing import List, Tuple
+
+import torch
+from torch import nn, Tensor
+import torch.nn.functional as F
+import pandas as pd
+import matplotlib.pyplot as plt
+from fastai.vision.all import *
+
+from .core import *
+from .pair_matching import *
+from .utils import *
+from .profiling import record
+
+# %% ../nbs/calibration.ipynb 6
+def _fit_platt(x, pos, neg, n_iter=100):
+    """Parameters `a`, `b` of the match probabilities `sigmoid(a * x + b)`, fitted with Newton's method"""
+    x, pos, neg = x.double(), pos.double(), neg.double()
+    n_pos, n_neg = pos.sum(), neg.sum()
+    target_pos, target_neg = (n_pos + 1) / (n_pos + 2), 1 / (n_neg + 2)
+    features = torch.stack([x, torch.ones_like(x)], dim=1)
+    params = x.new_zeros(2)
+    for _ in range(n_iter):
+        p = torch.sigmoid(features @ params)
+        grad = features.T @ (pos * (target_pos - p) + neg * (target_neg - p))
+        hessian = features.T @ (features * ((pos + neg) * p * (1 - p))[:, None])
+        step = torch.linalg.solve(hessian + 1e-12 * torch.eye(2, dtype=x.dtype), grad)
+        params += step
+        if step.abs().max() < 1e-10:
+            break
+    return params.float()
+
+
+def _fit_isotonic(x, pos, neg):
+    """Knots (distances and probabilities) of the non-increasing match probabilities closest to the empirical ones, fitted with pool adjacent violators"""
+    counts = (pos + neg).double()
+    blocks = torch.stack([x.double() * counts, pos.double(), counts], dim=1)[counts > 0]  # Weighted sum of distances, positives and total count of each block
+    while True:
+        rates = blocks[:, 1] / blocks[:, 2]
+        violators = rates[1:] >= rates[:-1]  # the previous block's rate isn't higher
+        if not violators.any():
+            break
+        block = F.pad((~violators).cumsum(0), (1, 0))  # all adjacent violators are pooled at once, as they're pooled in the solution anyway
+        blocks = blocks.new_zeros(int(block[-1]) + 1, 3).index_add_(0, block, blocks)
+    return (blocks[:, 0] / blocks[:, 2]).float(), (blocks[:, 1] / blocks[:, 2]).float()
+
+
+def _compressed_cuts(tp, fp, max_cuts):
+    """Indices of at most `max_cuts` of the cuts with the cumulative counts `tp`, `fp`, where the rates of each class reach a grid (denser near 0 and 1, where operating points are picked)"""
+    m = max((max_cuts - 24) // 144, 1)
+    rates = torch.cat([torch.linspace(0, 1, 6 * m + 1), torch.logspace(-6, 0, 6 * m + 1), 1 - torch.logspace(-6, 0, 6 * m + 1)]).double()
+    idxs = []
+    for counts in [tp.double(), fp.double()]:
+        idxs += [torch.searchsorted(counts, rates * counts[-1]), torch.searchsorted(counts, rates * counts[-1], right=True) - 1]
+    idxs = torch.cat(idxs).clamp(0, len(tp) - 1)
+    idxs = torch.cat([idxs, torch.searchsorted(tp, tp[idxs]), torch.searchsorted(fp, fp[idxs])])  # the lowest cut with the same rates
+    idxs = torch.cat([idxs, torch.tensor([0, len(tp) - 1])]).unique()
+    if len(idxs) > max_cuts:  # small grids are still denser than `max_cuts`, so they're subsampled evenly (keeping the extreme cuts)
+        idxs = idxs[torch.linspace(0, len(idxs) - 1, max_cuts).round().long().unique()]
+    return idxs
+
+
+def _interp(x: Tensor, xp: Tensor, fp: Tensor) -> Tensor:
+    """Piecewise-linear interpolation of the knots `xp`, `fp` (constant beyond them)"""
+    if xp.numel() == 1:
+        return fp.expand_as(x).clone()
+    i = torch.searchsorted(xp, x.contiguous()).clamp(1, xp.numel() - 1)
+    x0, x1 = xp[i - 1], xp[i]
+    w = ((x - x0) / (x1 - x0)).clamp(0, 1)
+    return fp[i - 1] + w * (fp[i] - fp[i - 1])
+
+# %% ../nbs/calibration.ipynb 8
+class Calibration(nn.Module):
+    """The ROC curve of classifying pairs by thresholding their distances, and calibrated match probabilities of distances"""
+    def __init__(self,
+                 thresholds: Tensor,  # Increasing cuts between distances
+                 tp: Tensor,  # Number of positive pairs with distances below each cut
+                 fp: Tensor,  # Number of negative pairs with distances below each cut
+                 method='isotonic',  # "isotonic" or "platt"
+                 platt: Tensor = None,  # Parameters `a`, `b` of the probabilities `sigmoid(a * distance + b)`, when `method` is "platt"
+                 knots: Tuple[Tensor, Tensor] = None):  # Distances and probabilities to interpolate, when `method` is "isotonic"
+        super().__init__()
+        assert method in {'isotonic', 'platt'}, f'Unknown method: {method}'
+        self.method = method
+        keep = torch.ones_like(tp, dtype=torch.bool)  # Cuts with the same counts as the previous one are redundant
+        keep[1:] = (tp[1:] != tp[:-1]) | (fp[1:] != fp[:-1])
+        self.register_buffer('thresholds', thresholds[keep].float())
+        self.register_buffer('tp', tp[keep].long())
+        self.register_buffer('fp', fp[keep].long())
+        self.register_buffer('platt', platt if platt is not None else torch.zeros(0))
+        knots_x, knots_p = knots if knots is not None else (torch.zeros(0), torch.zeros(0))
+        self.register_buffer('knots_x', knots_x)
+        self.register_buffer('knots_p', knots_p)
+
+    @classmethod
+    def _from_counts(cls, thresholds, tp, fp, x, pos, neg, method):
+        """From the cumulative counts below each cut, and the counts at each (increasing) distance `x`"""
+        with record('calibration'):
+            nonempty = (pos + neg) > 0
+            x, pos, neg = x[nonempty], pos[nonempty], neg[nonempty]
+            if method == 'platt':
+                return cls(thresholds, tp, fp, method, platt=_fit_platt(x, pos, neg))
+            return cls(thresholds, tp, fp, method, knots=_fit_isotonic(x, pos, neg))
+
+    @classmethod
+    def from_distances(cls,
+                       x: Tensor,
+                       y: Tensor,
+                       method='isotonic',
+                       max_cuts=1024):  # Keeps the cuts where the rates of each class reach a grid, or all of them if `None`
+        """Calibration of the distances `x` of pairs with binary targets `y` (see `Threshold.fit`)"""
+        y = y.flatten().bool()
+        thresholds, tp, fp = sorted_cuts(x, y)  # a cut before each distinct distance, and one after the last
+        x = torch.unique(x.flatten().float())
+        assert max_cuts is None or max_cuts >= 2, 'At least 2 cuts are needed, below and above all the distances'
+        if max_cuts is not None and len(thresholds) > max_cuts:
+            keep = _compressed_cuts(tp, fp, max_cuts)
+            sums = F.pad((x.double() * (tp.diff() + fp.diff())).cumsum(0), (1, 0))[keep]
+            thresholds, tp, fp = thresholds[keep], tp[keep], fp[keep]
+            x = (sums.diff() / (tp + fp).diff()).float()  # the mean distance between consecutive cuts
+        return cls._from_counts(thresholds, tp, fp, x, tp.diff(), fp.diff(), method)
+
+    @classmethod
+    def from_histogram(cls, hist: DistanceHistogram, method='isotonic'):
+        """Calibration of the distances counted in a `DistanceHistogram` (see `Threshold.fit_histogram`)"""
+        (fp, tp), totals = hist.cumulative_counts(), hist.totals
+        thresholds = F.pad(hist.edges, (0, 1), value=float('inf'))  # the inputs above the range are only below this cut
+        fp, tp = torch.cat([fp, totals[:1]]), torch.cat([tp, totals[1:]])
+        centers = torch.cat([hist.edges[:1], (hist.edges[1:] + hist.edges[:-1]) / 2, hist.edges[-1:]])  # the inputs outside the range are at its ends
+        neg, pos = torch.cat([hist.underflow[:, None], hist.counts, hist.overflow[:, None]], dim=1)
+        return cls._from_counts(thresholds, tp, fp, centers, pos, neg, method)
+
+    @property
+    def n_pos(self) -> int:
+        return int(self.tp[-1])
+
+    @property
+    def n_neg(self) -> int:
+        return int(self.fp[-1])
+
+    @property
+    def tar(self) -> Tensor:
+        """True accept rate at each threshold"""
+        return self.tp.double() / max(self.n_pos, 1)
+
+    @property
+    def far(self) -> Tensor:
+        """False accept rate at each threshold"""
+        return self.fp.double() / max(self.n_neg, 1)
+
+    @property
+    def frr(self) -> Tensor:
+        """False reject rate at each threshold"""
+        return 1 - self.tar
+
+    def forward(self, distances: Tensor) -> Tensor:
+        """Calibrated probabilities that pairs with `distances` match"""
+        if self.method == 'platt':
+            return torch.sigmoid(self.platt[0] * distances + self.platt[1])
+        return _interp(distances, self.knots_x, self.knots_p)
+
+# %% ../nbs/calibration.ipynb 10
+@patch
+@torch.jit.export
+def threshold_at_far(self: Calibration, far: float) -> float:
+    """The threshold with the highest true accept rate whose false accept rate is at most `far`"""
+    tar = self.tar
+    best = tar[int((self.far <= far).sum()) - 1]
+    return float(self.thresholds[int((tar < best).sum())])  # the lowest threshold with this rate
+
+
+@patch
+@torch.jit.export
+def threshold_at_frr(self: Calibration, frr: float) -> float:
+    """The threshold with the lowest false accept rate whose false reject rate is at most `frr`"""
+    return float(self.thresholds[int((self.frr > frr).sum())])
+
+
+@patch
+@torch.jit.export
+def eer(self: Calibration) -> Tuple[float, float]:
+    """The equal error rate, where the false accept and reject rates are closest, and its threshold"""
+    far, frr = self.far, self.frr
+    i = int((far - frr).abs().argmin())
+    return float((far[i] + frr[i]) / 2), float(self.thresholds[i])
+
+
+@patch
+def tar_at_far(self: Calibration, fars=(1e-1, 1e-2, 1e-3, 1e-4)) -> pd.DataFrame:
+    """True accept rates and thresholds at the target false accept rates `fars`"""
+    thresholds = [self.threshold_at_far(far) for far in fars]
+    idxs = torch.searchsorted(self.thresholds, torch.tensor(thresholds))
+    return pd.DataFrame({'far': self.far[idxs].tolist(), 'tar': self.tar[idxs].tolist(), 'threshold': thresholds},
+                        index=pd.Index(fars, name='target far'))
+
+
+@patch(as_prop=True)
+def auc(self: Calibration) -> float:
+    """Area under the ROC curve"""
+    return torch.trapezoid(self.tar, self.far).item()
+
+# %% ../nbs/calibration.ipynb 18
+@patch
+def plot_roc(self: Calibration, det=False, label=None, **kwargs):
+    """Plots the ROC curve (the true accept rate against the false accept rate), or the DET curve (false reject rate against false accept rate)"""
+    far, frr = self.far, self.frr
+    if not det:
+        plt.plot(far, 1 - frr, label=label, **kwargs)
+        plt.xlabel('False accept rate')
+        plt.ylabel('True accept rate')
+        return
+    eps = 1 / max(self.n_pos, self.n_neg, 2)  # rates of 0 or 1 are infinitely far away
+    probit = lambda p: torch.special.ndtri(p.clamp(eps, 1 - eps))
+    plt.plot(probit(far), probit(frr), label=label, **kwargs)
+    ticks = torch.tensor([.001, .01, .05, .2, .5, .8, .95])
+    plt.xticks(probit(ticks), [f'{t:.1%}' for t in ticks.tolist()])
+    plt.yticks(probit(ticks), [f'{t:.1%}' for t in ticks.tolist()])
+    plt.xlabel('False accept rate')
+    plt.ylabel('False reject rate')
+
+# %% ../nbs/calibration.ipynb 22
+@patch
+def calibrate(self: ThresholdSiamese,
+              dl: DataLoader,
+              method='isotonic',  # See `Calibration`
+              hist: DistanceHistogram = None,  # If passed, distances are counted in its bins (in constant memory) instead of being kept
+              path=None  # If passed, distances are kept in memory-mapped files with this path prefix, and counted in a fine histogram (see `DistanceBuffer.histogram`)
+              ) -> Calibration:
+    """The `Calibration` of this model's distances on a dataloader"""
+    if hist is not None:
+        return Calibration.from_histogram(self.distance.collect_distances(dl, hist), method)
+    buffer = self.distance.collect_distances(dl, DistanceBuffer(path=path))
+    if path is not None:  # sorting the distances would load them all into memory
+        return Calibration.from_histogram(buffer.histogram(), method)
+    return Calibration.from_distances(buffer.distances, buffer.targets, method)
@@ -0,0 +1,58 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/core.ipynb.
+
+# %% auto 0
+__all__ = ['normalized_squared_euclidean_distance', 'Threshold', 'NormalizedSquaredEuclideanDistance', 'distance_metric_module']
+
+# %% ../nbs/core.ipynb 4
+import torch
+from torch import nn, Tensor
+from torch.nn.functional import normalize
+
+# %% ../nbs/core.ipynb 5
+def normalized_squared_euclidean_distance(x1, x2):
+    r"""
+    Squared Euclidean distance over normalized vectors:
+    $$\left\| \frac{x_1}{\|x_1\|}-\frac{x_2}{\|x_2\|} \right\|^2 $$
+    """
+    assert x1.dim() <= 2
+    assert x2.dim() <= 2
+    x1 = normalize(x1, dim=-1)
+    x2 = normalize(x2, dim=-1)
+    return (x1 - x2).pow(2).sum(dim=-1)
+
+
+class Threshold(nn.Module):
+    """Classifies 1D inputs into 2 classes, based on whether they surpass a threshold or not"""
+    def __init__(self) -> None:
+        super().__init__()
+        self.t = nn.Parameter(torch.zeros(1))
+
+    def forward(self, x):
+        x = x - self.t
+        return torch.stack([x, -x], dim=-1)
+
+# %% ../nbs/core.ipynb 8
+class NormalizedSquaredEuclideanDistance(nn.Module):
+    """`normalized_squared_euclidean_distance` as a (scriptable) module"""
+    def forward(self, x1: Tensor, x2: Tensor) -> Tensor:
+        return normalized_squared_euclidean_distance(x1, x2)
+
+
+class _DistanceMetric(nn.Module):
+    """Wraps an arbitrary distance metric function, which can only be traced (not scripted)"""
+    def __init__(self, distance_metric):
+        super().__init__()
+        self.distance_metric = distance_metric
+
+    def forward(self, x1, x2):
+        return self.distance_metric(x1, x2)
+
+
+_metric_modules = {normalized_squared_euclidean_distance: NormalizedSquaredEuclideanDistance}
+
+def distance_metric_module(distance_metric) -> nn.Module:
+    """A module computing `distance_metric`, scriptable for the metrics in this library"""
+    if isinstance(distance_metric, nn.Module):
+        return distance_metric
+    module_cls = _metric_modules.get(distance_metric)
+    return module_cls() if module_cls is not None else _DistanceMetric(distance_metric)
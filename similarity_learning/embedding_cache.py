@@ -0,0 +1,145 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/embedding_cache.ipynb.
+
+# %% auto 0
+__all__ = ['content_hash', 'EmbeddingCache', 'InvalidateEmbeddingCaches']
+
+# %% ../nbs/embedding_cache.ipynb 4
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+from torch import nn
+from fastai.vision.all import *
+
+from .siamese import *
+from .pair_matching import *
+
+# %% ../nbs/embedding_cache.ipynb 5
+def content_hash(x: Tensor) -> List[bytes]:
+    """Keys each item in a batch by a hash of its content"""
+    x = x.detach().cpu().contiguous()
+    return [hashlib.blake2b(str(item.shape).encode() + item.numpy().tobytes(), digest_size=16).digest() for item in x]
+
+
+def _weights_version(model: nn.Module):
+    """Changes whenever any of the weights of `model` is replaced or modified in-place"""
+    # `Tensor._version` is PyTorch's (private) counter of in-place modifications, also used by autograd to detect them.
+    # It misses modifications that bypass it (e.g. through `.data`), hence `InvalidateEmbeddingCaches`
+    return tuple((t.data_ptr(), t._version) for t in itertools.chain(model.parameters(), model.buffers()))
+
+# %% ../nbs/embedding_cache.ipynb 6
+class EmbeddingCache:
+    """LRU cache of (flattened) embeddings, stored in memory or in a memory-mapped file"""
+    def __init__(self,
+                 max_items=65536,  # Least recently used embeddings are evicted beyond this number
+                 path=None,  # If passed, embeddings are stored in a memory-mapped file in this path instead of in memory
+                 key_fn=content_hash,  # Maps a batch of inputs to a list of hashable keys
+                 capacity=1024  # Initial number of embeddings the store can hold, doubled whenever it's exceeded (up to `max_items`)
+                 ):
+        store_attr('max_items, path, key_fn, capacity')
+        self.clear()
+
+    def clear(self):
+        """Invalidates all cached embeddings"""
+        self.slots = OrderedDict()  # key -> row in `self.store`, ordered from least to most recently used
+        self.store, self.weights_version = None, None
+        self.hits, self.misses = 0, 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _allocate(self, dim, capacity):
+        """Allocates the store with `capacity` rows, keeping the embeddings already stored"""
+        prev = self.store
+        if self.path is None:
+            self.store = torch.empty(capacity, dim)
+            if prev is not None:
+                self.store[:len(prev)] = prev
+            return
+        if prev is None:
+            self._memmap = np.memmap(self.path, dtype=np.float32, mode='w+', shape=(capacity, dim))
+        else:
+            self._memmap.flush()
+            with open(self.path, 'r+b') as f:  # Extending the file keeps the existing rows in place
+                f.truncate(capacity * dim * np.dtype(np.float32).itemsize)
+            self._memmap = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(capacity, dim))
+        self.store = torch.from_numpy(self._memmap)
+
+    def _free_slot(self):
+        if len(self.slots) < self.max_items:
+            slot = len(self.slots)
+            if slot == len(self.store):
+                self._allocate(self.store.shape[1], min(2 * len(self.store), self.max_items))
+            return slot
+        _, slot = self.slots.popitem(last=False)
+        return slot
+
+    def add(self, keys, embeddings: Tensor):
+        """Stores embeddings (a tensor of shape `(len(keys), dim)`) under the given keys"""
+        if self.store is None:
+            self._allocate(embeddings.shape[1], min(self.capacity, self.max_items))
+        embeddings = embeddings.detach().cpu()
+        for key, embedding in zip(keys, embeddings):
+            slot = self.slots.pop(key) if key in self.slots else self._free_slot()
+            self.store[slot] = embedding
+            self.slots[key] = slot
+
+    def __call__(self, backbone: nn.Module, x: Tensor) -> Tensor:
+        """Embeds a batch with `backbone`, only running it on inputs that aren't already cached"""
+        if _weights_version(backbone) != self.weights_version:
+            self.clear()
+            self.weights_version = _weights_version(backbone)
+
+        keys = self.key_fn(x)
+        hits = [i for i, k in enumerate(keys) if k in self.slots]
+        missing = {}  # key -> index of its first occurrence, so repeated inputs within the batch are embedded once
+        for i, k in enumerate(keys):
+            if k not in self.slots:
+                missing.setdefault(k, i)
+        self.hits, self.misses = self.hits + len(hits), self.misses + len(missing)
+
+        new_embeddings = backbone(x[list(missing.values())]).flatten(start_dim=1) if missing else None
+        if self.store is None:
+            self._allocate(new_embeddings.shape[1], min(self.capacity, self.max_items))
+
+        embeddings = torch.empty(len(keys), self.store.shape[1], dtype=self.store.dtype, device=x.device)
+        if hits:
+            slots = [self.slots[keys[i]] for i in hits]
+            for i in hits:
+                self.slots.move_to_end(keys[i])
+            embeddings[hits] = self.store[slots].to(embeddings.device)
+        if missing:
+            embeddings = embeddings.to(new_embeddings.dtype)
+            position = {k: j for j, k in enumerate(missing)}
+            idxs = [i for i, k in enumerate(keys) if k in position]
+            embeddings[idxs] = new_embeddings[[position[keys[i]] for i in idxs]]
+            self.add(list(missing), new_embeddings)
+        return embeddings
+
+# %% ../nbs/embedding_cache.ipynb 8
+@patch
+@contextmanager
+def cache_embeddings(self: DistanceSiamese, cache: EmbeddingCache = None):
+    """Temporarily uses `cache` (or a new `EmbeddingCache`) for embedding inputs"""
+    prev_cache = self.embedding_cache
+    self.embedding_cache = ifnone(cache, EmbeddingCache())
+    try:
+        yield self.embedding_cache
+    finally:
+        self.embedding_cache = prev_cache
+
+
+@patch
+@delegates(DistanceSiamese.cache_embeddings)
+def cache_embeddings(self: ThresholdSiamese, *args, **kwargs):
+    return self.distance.cache_embeddings(*args, **kwargs)
+
+# %% ../nbs/embedding_cache.ipynb 9
+class InvalidateEmbeddingCaches(Callback):
+    """Explicitly clears the embedding caches of the `DistanceSiamese`s in a `Learner`'s model after each optimizer step"""
+    def after_step(self):
+        for m in self.learn.model.modules():
+            if isinstance(m, DistanceSiamese) and m.embedding_cache is not None:
+                m.embedding_cache.clear()
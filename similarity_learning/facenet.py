@@ -16,6 +16,8 @@ class FaceNetInceptionResnetV1(InceptionResnetV1):
     def __init__(self, pretrained=True, classify=True):
         if pretrained is True:
             pretrained = 'vggface2'
+        if pretrained is False:
+            pretrained = None  # `InceptionResnetV1` only skips loading weights for `None`
         super().__init__(pretrained, classify)
 
     def forward(self, x):
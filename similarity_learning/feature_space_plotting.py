@@ -1,28 +1,137 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/feature_space_plotting.ipynb.
 
 # %% auto 0
-__all__ = ['plot_dataset_embedding']
+__all__ = ['randomized_pca', 'approximate_neighbors', 'neighbor_layout', 'plot_dataset_embedding']
 
 # %% ../nbs/feature_space_plotting.ipynb 3
+import math
+import operator
+from functools import reduce
+
 import numpy as np
 from fastai.vision.all import *
+from torch.nn.utils.rnn import pad_sequence
 import matplotlib.pyplot as plt
 
-# %% ../nbs/feature_space_plotting.ipynb 4
-def plot_dataset_embedding(dataset: Datasets, feature_extractor, num_samples_per_class=300, normalize_features=False, *args, **kwargs):
+from .profiling import record, count
+from .utils import precompute_features
+
+# %% ../nbs/feature_space_plotting.ipynb 5
+def randomized_pca(x: Tensor, dim=2, n_iter=4) -> Tensor:
+    """Projects the rows of `x` on their top `dim` principal components, found with a randomized SVD"""
+    x = x.flatten(start_dim=1).float()
+    x = x - x.mean(dim=0, keepdim=True)
+    _, _, v = torch.pca_lowrank(x, q=min(dim, *x.shape), center=False, niter=n_iter)
+    return x @ v[:, :dim]
+
+# %% ../nbs/feature_space_plotting.ipynb 8
+def _rp_tree_leaves(x: Tensor, leaf_size) -> Tensor:
+    """Partitions the rows of `x` with a random projection tree split at medians, returning the row indices in each leaf (padded with -1)"""
+    n = len(x)
+    order = torch.arange(n, device=x.device)
+    n_levels = max(math.ceil(math.log2(n / leaf_size)), 0)
+    for level in range(n_levels):
+        node = torch.arange(n, device=x.device) * 2**level // n  # the nodes of each level are contiguous, equally-sized blocks of `order`
+        directions = torch.randn(2**level, x.shape[1], device=x.device)
+        projections = (x[order] * directions[node]).sum(dim=1)
+        perm = projections.argsort()
+        perm = perm[node[perm].argsort(stable=True)]  # sorted by projection within each node, so its halves are its children
+        order = order[perm]
+    leaf = torch.arange(n, device=x.device) * 2**n_levels // n
+    return pad_sequence(order.split(leaf.bincount().tolist()), batch_first=True, padding_value=-1)
+
+
+def approximate_neighbors(x: Tensor,
+                          k=15,
+                          n_trees=4,  # More trees find more of the true neighbors, at a linear cost
+                          leaf_size=128
+                          ) -> Tuple[Tensor, Tensor]:
+    """Indices and distances of approximate `k` nearest neighbors of each row of `x`, among the rows sharing its leaf in random projection trees (fewer if `x` has at most `k` rows)"""
+    x = x.flatten(start_dim=1).float()
+    k = min(k, len(x) - 1)
+    idxs, distances = [], []
+    for _ in range(n_trees):
+        leaves = _rp_tree_leaves(x, max(leaf_size, 2 * (k + 1)))  # leaves are over half the leaf size, so each point has `k` others in its leaf
+        padding = leaves < 0
+        points = x[leaves.clamp(min=0)]
+        d = torch.cdist(points, points)
+        d.masked_fill_(padding[:, None, :], float('inf'))
+        d.diagonal(dim1=1, dim2=2).fill_(float('inf'))
+        d, i = d.topk(k, dim=2, largest=False)
+        tree_idxs = torch.full((len(x), k), -1, device=x.device)
+        tree_idxs[leaves[~padding]] = leaves.gather(1, i.flatten(start_dim=1)).view_as(i)[~padding]
+        tree_distances = torch.full((len(x), k), float('inf'), device=x.device)
+        tree_distances[leaves[~padding]] = d[~padding]
+        idxs.append(tree_idxs)
+        distances.append(tree_distances)
+
+    idxs, order = torch.cat(idxs, dim=1).sort(dim=1)
+    distances = torch.cat(distances, dim=1).gather(1, order)
+    distances[:, 1:][idxs[:, 1:] == idxs[:, :-1]] = float('inf')  # neighbors found by several trees
+    distances, order = distances.topk(k, dim=1, largest=False)
+    idxs = idxs.gather(1, order)
+    idxs[distances.isinf()] = -1
+    return idxs, distances
+
+# %% ../nbs/feature_space_plotting.ipynb 11
+def neighbor_layout(x: Tensor,
+                    n_neighbors=15,
+                    n_epochs=200,
+                    n_negatives=5,  # Random points repelling each point in each epoch
+                    lr=1.,
+                    pca_dim=50,  # Features are first reduced to this many dimensions with `randomized_pca`
+                    **kwargs  # Passed to `approximate_neighbors`
+                    ) -> Tensor:
+    """2D layout of the rows of `x` that preserves their nearest-neighbors graph"""
+    x = x.flatten(start_dim=1).float()
+    if x.shape[1] > pca_dim:
+        x = randomized_pca(x, pca_dim)
+    idxs, _ = approximate_neighbors(x, n_neighbors, **kwargs)
+    n_neighbors = idxs.shape[1]
+    idxs = torch.where(idxs >= 0, idxs, torch.arange(len(x), device=x.device)[:, None])  # a point exerts no force on itself
+
+    y = randomized_pca(x, 2)
+    y = 10 * y / y.abs().max()
+    for epoch in range(n_epochs):
+        alpha = lr * (1 - epoch / n_epochs)
+
+        diff = y[:, None] - y[idxs]
+        attraction = (-2 * diff / (1 + diff.pow(2).sum(dim=2, keepdim=True))).clamp(-4, 4)
+        diff = y[:, None] - y[torch.randint(len(x), (len(x), n_negatives), device=x.device)]
+        d2 = diff.pow(2).sum(dim=2, keepdim=True)
+        repulsion = (2 * diff / ((1e-3 + d2) * (1 + d2))).clamp(-4, 4)
+
+        y.index_add_(0, idxs.flatten(), -alpha * attraction.flatten(end_dim=1) / max(n_neighbors, 1))  # neighbors are pulled too
+        y += alpha * (attraction.mean(dim=1) + repulsion.mean(dim=1))
+    return y
+
+# %% ../nbs/feature_space_plotting.ipynb 17
+_projections = {'pca': randomized_pca, 'layout': neighbor_layout}
+
+def plot_dataset_embedding(dataset: Datasets,
+                           feature_extractor,
+                           num_samples_per_class=300,
+                           normalize_features=False,
+                           *args,
+                           projection='pca',  # Projects features with more than 2 dimensions: 'pca' (see `randomized_pca`) or 'layout' (see `neighbor_layout`)
+                           bs=256,  # The samples of all classes are embedded together, in batches of this size
+                           **kwargs):
     COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
 
-    feature_extractor.eval()
+    with record('sampling'):
+        samples = {c: ss.random_sub_dsets(num_samples_per_class) for c, ss in dataset.by_target.items()}
+    embeddings = precompute_features(reduce(operator.add, samples.values()), feature_extractor, bs=bs)[:, 0].flatten(start_dim=1)
+    count('embeddings', len(embeddings))
+    if normalize_features:
+        embeddings = torch.nn.functional.normalize(embeddings, dim=1)
+    if embeddings.shape[1] > 2:
+        with record('projection'):
+            embeddings = _projections[projection](embeddings)
 
-    with torch.no_grad():
-        for c, ss in dataset.by_target.items():
+    with record('plotting'):
+        for (c, ss), points in zip(samples.items(), embeddings.split([len(ss) for ss in samples.values()])):
             color = COLORS[dataset.vocab.o2i[c] % len(COLORS)]
-            samples = ss.random_sub_dsets(num_samples_per_class).load()[0]
-            embeddings = feature_extractor(samples)
-            if normalize_features:
-                embeddings = torch.nn.functional.normalize(embeddings, dim=1)
-
-            _plot_cluster(embeddings.cpu().numpy(), color, label=c, *args, **kwargs)
+            _plot_cluster(points.cpu().numpy(), color, label=c, *args, **kwargs)
 
     plt.legend()
 
@@ -0,0 +1,220 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/identification.ipynb.
+
+# %% auto 0
+__all__ = ['FlatIndex', 'kmeans', 'IVFIndex', 'benchmark_index']
+
+# %% ../nbs/identification.ipynb 4
+import time
+
+import torch
+from torch import nn
+from fastai.vision.all import *
+
+from .core import *
+from .siamese import *
+from .pair_matching import *
+
+# %% ../nbs/identification.ipynb 5
+class FlatIndex:
+    """Exact search, comparing each query to all stored embeddings"""
+    def __init__(self, distance_metric=normalized_squared_euclidean_distance):
+        self.distance_metric = distance_metric
+        self.ids, self.next_id = torch.empty(0, dtype=torch.long), 0
+        self.embeddings = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _new_ids(self, n, ids):
+        if ids is None:
+            ids = torch.arange(self.next_id, self.next_id + n)
+        ids = torch.as_tensor(ids, dtype=torch.long).cpu()
+        if len(ids.unique()) < len(ids) or torch.isin(ids, self.ids).any():
+            raise ValueError('`ids` must be unique and not already in the index')
+        self.next_id = max(self.next_id, ids.max().item() + 1) if len(ids) else self.next_id
+        return ids
+
+    def add(self, embeddings: Tensor, ids=None) -> Tensor:
+        """Adds embeddings of shape `(n, d)`, returning their ids (consecutive new ids if `ids` isn't passed)"""
+        ids = self._new_ids(len(embeddings), ids)
+        embeddings = embeddings.detach().cpu()
+        self.embeddings = embeddings if self.embeddings is None else torch.cat([self.embeddings, embeddings])
+        self.ids = torch.cat([self.ids, ids])
+        return ids
+
+    def remove(self, ids):
+        """Removes the embeddings with the given ids"""
+        if not len(self):
+            return
+        keep = ~torch.isin(self.ids, torch.as_tensor(ids, dtype=torch.long))
+        self.embeddings, self.ids = self.embeddings[keep], self.ids[keep]
+
+    def search(self, queries: Tensor, k: int):
+        """Distances and ids of the `k` nearest stored embeddings to each query, ordered from nearest"""
+        if not len(self):
+            return _no_neighbors(queries)
+        distances, idxs = tiled_distance_matrix(queries.cpu(), self.embeddings, self.distance_metric, k=k)
+        return distances, self.ids[idxs]
+
+    def range_search(self, queries: Tensor, radius: float):
+        """For each query, the distances and ids of all stored embeddings closer than `radius`, ordered from nearest"""
+        if not len(self):
+            return list(zip(*_no_neighbors(queries)))
+        distances = tiled_distance_matrix(queries.cpu(), self.embeddings, self.distance_metric)
+        return [_within_radius(d, self.ids, radius) for d in distances]
+
+    def _state(self):
+        return {'embeddings': self.embeddings}
+
+    def save(self, path):
+        """Saves the index to `path`, as tensors and plain values which can be loaded with `weights_only=True`"""
+        torch.save({'distance_metric': _metric_name(self.distance_metric), 'ids': self.ids, 'next_id': self.next_id,
+                    **self._state()}, path)
+
+    @classmethod
+    def load(cls, path):
+        """Loads an index saved with `save`"""
+        state = torch.load(path, weights_only=True)
+        index = cls.__new__(cls)
+        index.distance_metric = _metrics[state.pop('distance_metric')]
+        index.__dict__.update(state)
+        return index
+
+
+_metrics = {f.__name__: f for f in [normalized_squared_euclidean_distance]}
+
+def _metric_name(distance_metric):
+    """The name under which `distance_metric` is saved, only the metrics in this library can be rebuilt on load"""
+    name = getattr(distance_metric, '__name__', None)
+    if _metrics.get(name) is not distance_metric:
+        raise ValueError(f'Only the distance metrics in this library can be saved, got {distance_metric}')
+    return name
+
+
+def _no_neighbors(queries):
+    """Distances and ids of no neighbors for each query, as found in an empty index"""
+    return queries.new_empty(len(queries), 0).cpu(), torch.empty(len(queries), 0, dtype=torch.long)
+
+
+def _within_radius(distances, ids, radius):
+    mask = distances < radius
+    distances, order = distances[mask].sort()
+    return distances, ids[mask][order]
+
+# %% ../nbs/identification.ipynb 8
+@patch
+def identify(self: ThresholdSiamese, index: FlatIndex, probes: Tensor):
+    """For each probe embedding, the distances and ids of all the matching embeddings in `index`"""
+    return index.range_search(probes, self.threshold.t.item())
+
+# %% ../nbs/identification.ipynb 11
+def kmeans(x: Tensor, k: int, distance_metric=normalized_squared_euclidean_distance, n_iter=10):
+    """Lloyd's k-means clustering, returning the centroids"""
+    centroids = x[torch.randperm(len(x))[:k]].clone()
+    for _ in range(n_iter):
+        _, assignments = tiled_distance_matrix(x, centroids, distance_metric, k=1)
+        assignments = assignments[:, 0]
+        counts = torch.bincount(assignments, minlength=len(centroids))
+        sums = torch.zeros_like(centroids).index_add_(0, assignments, x)
+        nonempty = counts > 0
+        centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+    return centroids
+
+
+class IVFIndex(FlatIndex):
+    """Approximate search, comparing each query only to embeddings in the `n_probe` nearest k-means clusters"""
+    def __init__(self,
+                 n_lists=100,  # Number of clusters
+                 n_probe=8,  # Number of clusters searched for each query
+                 distance_metric=normalized_squared_euclidean_distance,
+                 n_iter=10  # k-means iterations
+                 ):
+        super().__init__(distance_metric)
+        del self.embeddings  # stored per cluster, in `lists`
+        store_attr('n_lists, n_probe, n_iter')
+        self.centroids = None
+        self.lists = []  # (embeddings, ids) per cluster
+
+    def train(self, embeddings: Tensor):
+        """Fits the clusters to a representative sample of embeddings"""
+        self.centroids = kmeans(embeddings.detach().cpu(), self.n_lists, self.distance_metric, self.n_iter)
+        self.lists = [(self.centroids.new_empty(0, self.centroids.shape[1]), torch.empty(0, dtype=torch.long))
+                      for _ in self.centroids]
+
+    def _nearest_lists(self, x, k):
+        return tiled_distance_matrix(x, self.centroids, self.distance_metric, k=min(k, len(self.centroids)))[1]
+
+    def add(self, embeddings: Tensor, ids=None) -> Tensor:
+        """Like `FlatIndex.add`, but first fits the clusters to `embeddings` if `IVFIndex.train` wasn't called"""
+        if self.centroids is None:
+            self.train(embeddings)
+        ids = self._new_ids(len(embeddings), ids)
+        embeddings = embeddings.detach().cpu()
+        assignments = self._nearest_lists(embeddings, 1)[:, 0]
+        for l in assignments.unique().tolist():
+            mask = assignments == l
+            list_embeddings, list_ids = self.lists[l]
+            self.lists[l] = torch.cat([list_embeddings, embeddings[mask]]), torch.cat([list_ids, ids[mask]])
+        self.ids = torch.cat([self.ids, ids])
+        return ids
+
+    def remove(self, ids):
+        if not len(self):
+            return
+        ids = torch.as_tensor(ids, dtype=torch.long)
+        for l, (list_embeddings, list_ids) in enumerate(self.lists):
+            keep = ~torch.isin(list_ids, ids)
+            self.lists[l] = list_embeddings[keep], list_ids[keep]
+        self.ids = self.ids[~torch.isin(self.ids, ids)]
+
+    def _state(self):
+        return {'centroids': self.centroids, 'lists': self.lists, 'n_lists': self.n_lists, 'n_probe': self.n_probe, 'n_iter': self.n_iter}
+
+    def _probed(self, queries):
+        """Yields each probed cluster, with the indices of the queries probing it and the rank of the cluster for those queries"""
+        nearest_lists = self._nearest_lists(queries, self.n_probe)
+        for l in nearest_lists.unique().tolist():
+            query_idxs, rank = (nearest_lists == l).nonzero(as_tuple=True)
+            yield self.lists[l], query_idxs, rank
+
+    def search(self, queries: Tensor, k: int):
+        """Like `FlatIndex.search`, but missing neighbors (if the probed clusters are too small) have infinite distances and an id of -1"""
+        if not len(self):
+            return _no_neighbors(queries)
+        queries = queries.cpu()
+        n_probe = min(self.n_probe, len(self.centroids))
+        candidate_distances = queries.new_full((len(queries), n_probe, k), float('inf'))
+        candidate_ids = torch.full((len(queries), n_probe, k), -1)
+        for (list_embeddings, list_ids), query_idxs, rank in self._probed(queries):
+            if not len(list_ids):
+                continue
+            distances, idxs = tiled_distance_matrix(queries[query_idxs], list_embeddings, self.distance_metric, k=k)
+            candidate_distances[query_idxs, rank, :distances.shape[1]] = distances
+            candidate_ids[query_idxs, rank, :distances.shape[1]] = list_ids[idxs]
+        distances, nearest = candidate_distances.flatten(1).topk(min(k, len(self)), dim=1, largest=False)
+        return distances, candidate_ids.flatten(1).gather(1, nearest)
+
+    def range_search(self, queries: Tensor, radius: float):
+        if not len(self):
+            return list(zip(*_no_neighbors(queries)))
+        queries = queries.cpu()
+        results = [([], []) for _ in queries]
+        for (list_embeddings, list_ids), query_idxs, _ in self._probed(queries):
+            if not len(list_ids):
+                continue
+            for q, distances in zip(query_idxs.tolist(), tiled_distance_matrix(queries[query_idxs], list_embeddings, self.distance_metric)):
+                results[q][0].append(distances)
+                results[q][1].append(list_ids)
+        return [_within_radius(torch.cat(d), torch.cat(i), radius) if d else (queries.new_empty(0), torch.empty(0, dtype=torch.long))
+                for d, i in results]
+
+# %% ../nbs/identification.ipynb 17
+def benchmark_index(index, gallery: Tensor, queries: Tensor, k=10, exact_ids: Tensor = None):
+    """Recall@k (compared to `exact_ids`, if passed) and queries per second of an index"""
+    index.add(gallery)
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    stats = {'qps': len(queries) / (time.perf_counter() - start)}
+    if exact_ids is not None:
+        stats[f'recall@{k}'] = torch.stack([torch.isin(i, e).float().mean() for i, e in zip(ids, exact_ids)]).mean().item()
+    return stats
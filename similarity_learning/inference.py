@@ -0,0 +1,134 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/inference.ipynb.
+
+# %% auto 0
+__all__ = ['to_torchscript', 'to_onnx', 'benchmark_latency', 'Autocast', 'model_size', 'precision_report']
+
+# %% ../nbs/inference.ipynb 4
+import io
+import time
+from copy import deepcopy
+from itertools import islice
+
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+from torch import nn, Tensor
+from fastai.vision.all import *
+
+from .siamese import *
+from .pair_matching import *
+from .utils import *
+
+# %% ../nbs/inference.ipynb 5
+from .core import NormalizedSquaredEuclideanDistance, distance_metric_module
+from .serving import InferenceSiamese
+
+# %% ../nbs/inference.ipynb 6
+@patch
+def for_inference(self: ThresholdSiamese) -> InferenceSiamese:
+    """An `InferenceSiamese` (in eval mode) sharing this model's backbone and distance metric, with a copy of its current threshold"""
+    return InferenceSiamese(self.distance.backbone, self.distance.distance_metric, self.threshold.t).eval()
+
+# %% ../nbs/inference.ipynb 10
+def to_torchscript(model: InferenceSiamese,
+                   example: Tuple[Tensor, Tensor] = None,  # If passed, the model is traced on these inputs instead of scripted (e.g. for custom distance metrics)
+                   optimize=True  # Freeze the module and apply inference optimizations (e.g. folding batch-norm into convolutions)
+                   ) -> torch.jit.ScriptModule:
+    """Compiles an inference module to TorchScript"""
+    model = model.eval()
+    with torch.no_grad():
+        compiled = torch.jit.script(model) if example is None else torch.jit.trace(model, example)
+    return torch.jit.optimize_for_inference(compiled) if optimize else compiled
+
+
+def to_onnx(model: InferenceSiamese,
+            path,
+            example: Tuple[Tensor, Tensor],  # Inputs to trace the model on. Their batch size is exported as a dynamic axis
+            opset_version=17):
+    """Exports an inference module to an ONNX file with inputs `x1`, `x2` and outputs `distances`, `matches`"""
+    batch = {0: 'batch'}
+    with torch.no_grad():
+        torch.onnx.export(model.eval(), tuple(example), str(path), opset_version=opset_version,
+                          input_names=['x1', 'x2'], output_names=['distances', 'matches'],
+                          dynamic_axes={'x1': batch, 'x2': batch, 'distances': batch, 'matches': batch})
+    return path
+
+# %% ../nbs/inference.ipynb 17
+def benchmark_latency(model, inputs: Tuple[Tensor, ...], n_iter=20, n_warmup=3) -> float:
+    """Median latency (in milliseconds) of calling `model` on `inputs` under `torch.inference_mode`"""
+    times = []
+    with torch.inference_mode():
+        for i in range(n_warmup + n_iter):
+            start = time.perf_counter()
+            model(*inputs)
+            if i >= n_warmup:
+                times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times))
+
+# %% ../nbs/inference.ipynb 22
+@patch
+def quantized(self: ThresholdSiamese,
+              calibration_dl: DataLoader = None,  # Pairs for calibrating activation ranges. If not passed, only linear layers are quantized (dynamically)
+              n_batches: int = None  # Calibrate on only this many batches of `calibration_dl`
+              ) -> ThresholdSiamese:
+    """A copy of the model with an int8 backbone, for CPU inference with the current `torch.backends.quantized.engine`"""
+    model = deepcopy(self).eval().cpu()
+    backbone = model.distance.backbone
+    if calibration_dl is None:
+        model.distance.backbone = quantize_dynamic(backbone, {nn.Linear}, dtype=torch.qint8)
+        return model
+
+    (x1, _), _ = first(calibration_dl)
+    backbone = prepare_fx(backbone, get_default_qconfig_mapping(torch.backends.quantized.engine), (x1.cpu(),))
+    with torch.no_grad():
+        for (x1, x2), _ in islice(calibration_dl, n_batches):
+            backbone(x1.cpu())
+            backbone(x2.cpu())
+    model.distance.backbone = convert_fx(backbone)
+    return model
+
+# %% ../nbs/inference.ipynb 23
+class Autocast(nn.Module):
+    """Runs a module under CPU autocast (e.g. in bfloat16), returning float32 outputs"""
+    def __init__(self, module: nn.Module, dtype=torch.bfloat16):
+        super().__init__()
+        self.module, self.dtype = module, dtype
+
+    def forward(self, x):
+        with torch.autocast('cpu', dtype=self.dtype):
+            x = self.module(x)
+        return x.float()  # distances are compared to the threshold in full precision
+
+
+@patch
+def autocasted(self: ThresholdSiamese, dtype=torch.bfloat16) -> ThresholdSiamese:
+    """A copy of the model whose backbone runs under CPU autocast in `dtype`"""
+    model = deepcopy(self)
+    model.distance.backbone = Autocast(model.distance.backbone, dtype)
+    return model
+
+# %% ../nbs/inference.ipynb 27
+def model_size(model: nn.Module) -> int:
+    """Size of the serialized `state_dict` of a model, in bytes"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def precision_report(models: Dict[str, nn.Module],  # Variants of the same model, the first being the reference
+                     evaluate: Callable[[nn.Module], float],  # Computes the metric of a model, e.g. its mean cross-validation accuracy
+                     inputs: Tuple[Tensor, ...],  # Inputs for measuring latency, see `benchmark_latency`
+                     tolerance=.005,  # Maximal decrease of the metric relative to the reference
+                     metric='accuracy',
+                     n_iter=20
+                     ) -> pd.DataFrame:
+    """Compares the metric, latency and size of model variants to the first one"""
+    rows = [{'model': name,
+             metric: evaluate(model),
+             'latency (ms)': benchmark_latency(model, inputs, n_iter),
+             'size (MB)': model_size(model) / 2**20}
+            for name, model in models.items()]
+    report = pd.DataFrame(rows).set_index('model')
+    report['delta'] = report[metric] - report[metric].iloc[0]
+    report['within tolerance'] = report['delta'] >= -tolerance
+    return report
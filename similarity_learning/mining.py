@@ -0,0 +1,154 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/mining.ipynb.
+
+# %% auto 0
+__all__ = ['ClassBalancedDL', 'InBatchPairs', 'MinedContrastiveLoss', 'BatchHardTripletLoss', 'MultiSimilarityLoss',
+           'InfoNCELoss']
+
+# %% ../nbs/mining.ipynb 4
+import torch
+from torch import nn
+from fastai.vision.all import *
+
+from fastai_datasets.all import *
+
+from .core import *
+from .siamese import *
+
+# %% ../nbs/mining.ipynb 6
+class ClassBalancedDL(TfmdDL):
+    """Training batches (when shuffling) of `bs // n_per_class` random classes, with `n_per_class` random items each (AKA P×K sampling)"""
+    def __init__(self, dataset=None, bs=64, n_per_class=4, **kwargs):
+        assert bs % n_per_class == 0, 'Expected a batch size divisible by `n_per_class`'
+        self.n_per_class = n_per_class
+        super().__init__(dataset=dataset, bs=bs, **kwargs)
+
+    def new(self, dataset=None, cls=None, **kwargs):
+        return super().new(dataset, cls, **merge({'n_per_class': self.n_per_class}, kwargs))
+
+    def get_idxs(self):
+        if self.n == 0 or not self.shuffle:
+            return super().get_idxs()
+        class_idxs = list(groupby(enumerate(int(t) for t in self.dataset.i2t), key=1, val=0).values())
+        n_classes = self.bs // self.n_per_class
+        idxs = []
+        for _ in range(len(self)):
+            classes = self.rng.sample(class_idxs, n_classes) if len(class_idxs) >= n_classes else self.rng.choices(class_idxs, k=n_classes)
+            for c in classes:
+                idxs += self.rng.sample(c, self.n_per_class) if len(c) >= self.n_per_class else self.rng.choices(c, k=self.n_per_class)
+        return idxs
+
+
+@patch
+@delegates(Datasets.dls)
+def class_balanced_dls(self: Datasets, n_per_class=4, **kwargs) -> DataLoaders:
+    """Like `Datasets.dls`, with class-balanced training batches (see `ClassBalancedDL`)"""
+    return self.dls(dl_type=ClassBalancedDL, dl_kwargs=[{'n_per_class': n_per_class}] * self.n_subsets, **kwargs)
+
+# %% ../nbs/mining.ipynb 9
+class InBatchPairs(Module):
+    """Embeds a batch of single inputs once with a `DistanceSiamese`, and outputs the distances between all pairs of them"""
+    def __init__(self, siamese: DistanceSiamese):
+        self.siamese = siamese
+
+    def forward(self, x):
+        features = self.siamese.embed(x)
+        return self.siamese.distance_matrix(features, features)
+
+# %% ../nbs/mining.ipynb 12
+def _pair_masks(targets):
+    """Masks of the positive and negative pairs in a batch, excluding each input's pair with itself"""
+    same = targets[:, None] == targets[None]
+    return same & ~torch.eye(len(targets), dtype=torch.bool, device=targets.device), ~same
+
+
+def _all_pairs(distances, positive, negative, margin):
+    return positive, negative
+
+
+def _hard_pairs(distances, positive, negative, margin):
+    """The farthest positive and the nearest negative of each anchor"""
+    farthest = distances.masked_fill(~positive, -float('inf')).argmax(dim=1, keepdim=True)
+    nearest = distances.masked_fill(~negative, float('inf')).argmin(dim=1, keepdim=True)
+    hardest_positive = torch.zeros_like(positive).scatter_(1, farthest, True) & positive
+    hardest_negative = torch.zeros_like(negative).scatter_(1, nearest, True) & negative
+    return hardest_positive, hardest_negative
+
+
+def _semi_hard_pairs(distances, positive, negative, margin):
+    """All positives, and the negatives within the margin that are farther than all of the anchor's positives"""
+    farthest_positive = distances.masked_fill(~positive, -float('inf')).max(dim=1, keepdim=True).values
+    return positive, negative & (distances > farthest_positive) & (distances < margin)
+
+
+_miners = {'all': _all_pairs, 'hard': _hard_pairs, 'semi-hard': _semi_hard_pairs}
+
+
+class MinedContrastiveLoss(Module):
+    """Contrastive loss (as in `ContrastiveLoss`) over the pairs mined from a matrix of distances between all inputs of a batch"""
+    def __init__(self,
+                 margin=1.,  # Negatives are pushed until they are at least this far apart
+                 mining='semi-hard'):  # Which pairs to train on: 'all', 'hard' or 'semi-hard'
+        assert mining in _miners, f'Expected one of {list(_miners)}'
+        store_attr()
+
+    def mine(self, distances, targets):
+        """Masks of the positive and negative pairs to train on"""
+        positive, negative = _pair_masks(targets)
+        return _miners[self.mining](distances.detach(), positive, negative, self.margin)
+
+    def forward(self, distances, targets):
+        positive, negative = self.mine(distances, targets)
+        losses = torch.cat([distances[positive], (self.margin - distances[negative]).clamp(min=0)])
+        return losses.mean() if len(losses) else distances.sum() * 0
+
+# %% ../nbs/mining.ipynb 16
+class BatchHardTripletLoss(Module):
+    """Triplet loss between each anchor's farthest positive and nearest negative (AKA batch-hard)"""
+    def __init__(self, margin=.2):
+        store_attr()
+
+    def forward(self, distances, targets):
+        positive, negative = _pair_masks(targets)
+        farthest_positive = distances.masked_fill(~positive, -float('inf')).max(dim=1).values
+        nearest_negative = distances.masked_fill(~negative, float('inf')).min(dim=1).values
+        valid = positive.any(dim=1) & negative.any(dim=1)
+        losses = (farthest_positive - nearest_negative + self.margin).clamp(min=0)[valid]
+        return losses.mean() if len(losses) else distances.sum() * 0
+
+
+def _masked_softplus_logsumexp(x, mask):
+    r"""$\log(1 + \sum_{j \in mask} e^{x_{ij}})$ of each row"""
+    return F.softplus(torch.logsumexp(x.masked_fill(~mask, -float('inf')), dim=1))
+
+
+class MultiSimilarityLoss(Module):
+    """Multi-similarity loss (Wang et al., 2019), with similarities $1 - d/2$ (cosine similarities for `normalized_squared_euclidean_distance`)"""
+    def __init__(self, alpha=2., beta=50., base=.5, epsilon=.1):
+        store_attr()
+
+    def forward(self, distances, targets):
+        similarities = 1 - distances / 2
+        positive, negative = _pair_masks(targets)
+        # Mining: negatives more similar than the least similar positive (up to `epsilon`), and vice versa
+        hardest_positive = similarities.detach().masked_fill(~positive, float('inf')).min(dim=1, keepdim=True).values
+        hardest_negative = similarities.detach().masked_fill(~negative, -float('inf')).max(dim=1, keepdim=True).values
+        negative = negative & (similarities + self.epsilon > hardest_positive)
+        positive = positive & (similarities - self.epsilon < hardest_negative)
+
+        positive_loss = _masked_softplus_logsumexp(-self.alpha * (similarities - self.base), positive) / self.alpha
+        negative_loss = _masked_softplus_logsumexp(self.beta * (similarities - self.base), negative) / self.beta
+        return (positive_loss + negative_loss).mean()
+
+
+class InfoNCELoss(Module):
+    """Supervised InfoNCE (AKA NT-Xent) loss: each positive is classified against all other inputs, with logits $-d / temperature$"""
+    def __init__(self, temperature=.1):
+        store_attr()
+
+    def forward(self, distances, targets):
+        positive, _ = _pair_masks(targets)
+        logits = (-distances / self.temperature).masked_fill(torch.eye(len(targets), dtype=torch.bool, device=distances.device), -float('inf'))
+        log_probs = logits - torch.logsumexp(logits, dim=1, keepdim=True)
+        has_positive = positive.any(dim=1)
+        losses = -(log_probs.masked_fill(~positive, 0).sum(dim=1)[has_positive] / positive.sum(dim=1)[has_positive])
+        return losses.mean() if len(losses) else distances.sum() * 0
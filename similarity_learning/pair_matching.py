@@ -10,8 +10,10 @@ import numpy as np
 from fastai.vision.all import *
 from fastprogress.fastprogress import *
 
+from .core import *
 from .siamese import *
 from .utils import *
+from .profiling import record
 
 
 class ThresholdSiamese(nn.Module):
@@ -32,11 +34,38 @@ class ThresholdSiamese(nn.Module):
 
 # %% ../nbs/pair_matching.ipynb 10
 @patch
-def fit_threshold(self: ThresholdSiamese, train_dl: DataLoader):
-    """Picks a threshold that maximizes the accuracy on a dataloader"""
+def fit_threshold(self: ThresholdSiamese,
+                  train_dl: DataLoader,
+                  objective='accuracy',  # See `Threshold.fit`
+                  target_rate=None,  # See `Threshold.fit`
+                  hist: DistanceHistogram = None,  # If passed, distances are counted in its bins (in constant memory) instead of being kept
+                  path=None  # If passed, distances are kept in memory-mapped files with this path prefix, and counted in a fine histogram (see `DistanceBuffer.histogram`)
+                  ):
+    """Picks a threshold that maximizes `objective` (accuracy by default) on a dataloader"""
     self.eval().to(train_dl.device)
-    with torch.no_grad():
-        distances, targets = zip(*((self.distance(x), y) for x, y in progress_bar(train_dl, leave=False)))
-        distances, targets = torch.cat(distances).as_subclass(Tensor), torch.cat(targets).as_subclass(Tensor)
+    if hist is not None:
+        self.distance.collect_distances(train_dl, hist)
+        with record('threshold fitting'):
+            return self.threshold.fit_histogram(hist, objective, target_rate)
+
+    buffer = self.distance.collect_distances(train_dl, DistanceBuffer(path=path))
+    with record('threshold fitting'):
+        if path is not None:  # sorting the distances would load them all into memory
+            return self.threshold.fit_histogram(buffer.histogram(), objective, target_rate)
+        return self.threshold.fit(buffer.distances, buffer.targets, objective, target_rate)
 
-        return self.threshold.fit(distances, targets) 
+# %% ../nbs/pair_matching.ipynb 27
+@patch
+@delegates(tiled_distance_matrix, but=['distance_metric'])
+def match(self: ThresholdSiamese,
+          probes: Tensor,  # Embeddings of shape `(n_probes, d)`
+          gallery: Tensor,  # Embeddings of shape `(n_gallery, d)`
+          k=None,  # If passed, only the `k` nearest gallery items are considered for each probe
+          **kwargs):
+    """Returns the probe-gallery distances and whether they match (plus the gallery indices, if `k` is passed)"""
+    with torch.no_grad():
+        if k is None:
+            distances = self.distance.distance_matrix(probes, gallery, **kwargs)
+            return distances, distances < self.threshold.t
+        distances, idxs = self.distance.distance_matrix(probes, gallery, k=k, **kwargs)
+        return distances, idxs, distances < self.threshold.t
@@ -0,0 +1,197 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/profiling.ipynb.
+
+# %% auto 0
+__all__ = ['Profiler', 'profiling', 'add_time', 'record', 'count', 'profiled', 'ProfileCallback']
+
+# %% ../nbs/profiling.ipynb 4
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+from contextlib import contextmanager, nullcontext
+
+import torch
+from fastai.callback.core import Callback
+from fastai.torch_core import find_bs
+
+# %% ../nbs/profiling.ipynb 5
+class Profiler:
+    """Time spent in each section of code (see `record`), the number of items processed (see `count`) and peak memory increase, over a `profiling` context"""
+    def __init__(self):
+        self.times, self.counts = defaultdict(float), defaultdict(int)
+        self.elapsed, self.peak_memory = 0., 0
+
+    def add(self, name, seconds):
+        self.times[name] += seconds
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Seconds spent in each section (inclusive of nested sections), items per second of each counted unit, and peak memory increase in MB"""
+        return {**{f'{name} (s)': t for name, t in self.times.items()},
+                **{f'{unit}/sec': n / self.elapsed for unit, n in self.counts.items()},
+                'peak memory (MB)': self.peak_memory / 2**20}
+
+
+_local = threading.local()  # profilers are active per thread, e.g. for `RepeatedExperiment` iterations running in threads
+
+def _active_profilers():
+    return getattr(_local, 'profilers', ())
+
+
+def _resident_memory():
+    """Current resident memory of the process in bytes, or `None` where it can't be read (it's read from `/proc`)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _max_resident_memory():
+    """Peak resident memory over the lifetime of the process, in bytes"""
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024  # reported in bytes on macOS and in KB elsewhere
+
+
+class _MemoryMonitor:
+    """Peak memory within its context, beyond the memory in use when entering it.
+    Measures allocated CUDA memory if CUDA is in use, and otherwise the resident memory of the process, sampled in a background thread.
+    Where the current resident memory can't be read, only increases of its lifetime peak are measured."""
+    def __init__(self, interval=.001):
+        self.interval, self.peak_increase = interval, 0
+        self._stop, self._thread = threading.Event(), None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, _resident_memory())
+
+    def __enter__(self):
+        self._cuda = torch.cuda.is_initialized()
+        if self._cuda:
+            torch.cuda.reset_peak_memory_stats()
+            self._base = torch.cuda.memory_allocated()
+        elif _resident_memory() is not None:
+            self._base = self._peak = _resident_memory()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            self._base = _max_resident_memory()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._cuda:
+            peak = torch.cuda.max_memory_allocated()
+        elif self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            peak = max(self._peak, _resident_memory())
+        else:
+            peak = _max_resident_memory()
+        self.peak_increase = max(peak - self._base, 0)
+
+
+def _synchronize():
+    """Waits for queued CUDA kernels, so they're timed in the section that launched them"""
+    if torch.cuda.is_initialized():
+        torch.cuda.synchronize()
+
+
+@contextmanager
+def profiling(trace_path=None  # If passed, a `torch.profiler` trace (with the recorded sections) is also exported to this path, to view with chrome://tracing or Perfetto
+              ):
+    """Profiles the code run in its context (in the current thread), yielding a `Profiler` with the results"""
+    profiler = Profiler()
+    _local.profilers = (*_active_profilers(), profiler)
+    memory = _MemoryMonitor().__enter__()  # memory is measured for the whole process (or CUDA device)
+    trace = torch.profiler.profile(record_shapes=True) if trace_path is not None else nullcontext()
+    start = time.perf_counter()
+    try:
+        with trace:
+            yield profiler
+    finally:
+        _synchronize()
+        profiler.elapsed = time.perf_counter() - start
+        memory.__exit__(None, None, None)
+        profiler.peak_memory = memory.peak_increase
+        _local.profilers = tuple(p for p in _active_profilers() if p is not profiler)
+    if trace_path is not None:
+        trace.export_chrome_trace(str(trace_path))
+
+# %% ../nbs/profiling.ipynb 6
+def add_time(name, seconds):
+    """Adds time to section `name` of the active profilers"""
+    for profiler in _active_profilers():
+        profiler.add(name, seconds)
+
+
+@contextmanager
+def record(name):
+    """Adds the time spent in its context to section `name` of the active profilers (sections can be nested, and an outer section's time includes the inner ones)"""
+    if not _active_profilers():
+        yield
+        return
+    _synchronize()
+    start = time.perf_counter()
+    with torch.profiler.record_function(name):
+        yield
+    _synchronize()
+    add_time(name, time.perf_counter() - start)
+
+
+def count(unit, n):
+    """Counts `n` processed items of `unit` (e.g. 'pairs') in the active profilers"""
+    for profiler in _active_profilers():
+        profiler.counts[unit] += n
+
+
+def profiled(iterable, name='data loading'):
+    """Iterates over `iterable` (e.g. a `DataLoader`), recording the time spent waiting for each item in section `name`"""
+    iterator = iter(iterable)
+    while True:
+        with record(name):
+            item = next(iterator, StopIteration)
+        if item is StopIteration:
+            return
+        yield item
+
+# %% ../nbs/profiling.ipynb 14
+class ProfileCallback(Callback):
+    """Profiles fitting and validating a `Learner`, recording data loading, forward, loss, backward and optimizer step times (in `self.profiler`)"""
+    order = -100  # so the other callbacks' work is timed within the steps
+
+    def __init__(self, trace_path=None):
+        self.trace_path, self.profiler = trace_path, None
+        self._context = self._started_by = None
+
+    def _start(self, event):
+        if self._context is None:
+            self._context, self._started_by = profiling(self.trace_path), event
+            self.profiler = self._context.__enter__()
+
+    def _stop(self, event):
+        if self._context is not None and self._started_by == event:
+            self._context.__exit__(None, None, None)
+            self._context = None
+
+    def _lap(self, name):
+        now = time.perf_counter()
+        add_time(name, now - self._last)
+        self._last = now
+
+    def before_fit(self): self._start('fit')
+    def after_fit(self): self._stop('fit')
+    def before_epoch(self): self._start('epoch')  # e.g. in `Learner.validate`, which runs a single epoch without fitting
+    def after_epoch(self): self._stop('epoch')
+    def before_train(self): self._last = time.perf_counter()
+    def before_validate(self): self._last = time.perf_counter()
+    def before_batch(self): self._lap('data loading')
+    def after_pred(self): _synchronize(); self._lap('forward')
+    def after_loss(self): self._lap('loss')
+    def after_backward(self): _synchronize(); self._lap('backward')
+    def after_step(self): self._lap('step')
+    def after_batch(self):
+        count('pairs' if isinstance(self.xb[0], (tuple, list)) else 'items', find_bs(self.yb))
+        self._last = time.perf_counter()
@@ -0,0 +1,203 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/serving.ipynb.
+
+# %% auto 0
+__all__ = ['InferenceSiamese', 'MicroBatcher', 'VerificationService', 'generate_load']
+
+# %% ../nbs/serving.ipynb 4
+import asyncio
+import random
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Tuple
+
+import torch
+from torch import nn, Tensor
+
+from .core import (
+    normalized_squared_euclidean_distance, Threshold, NormalizedSquaredEuclideanDistance, distance_metric_module)
+
+# %% ../nbs/serving.ipynb 5
+class InferenceSiamese(nn.Module):
+    """A `ThresholdSiamese` fused for inference, returning the distances of pairs and whether they match"""
+    def __init__(self,
+                 backbone: nn.Module,  # Embeds inputs in a feature space, e.g. cut with `cut_model_by_name`
+                 distance_metric = normalized_squared_euclidean_distance,  # A function or a module, see `distance_metric_module`
+                 threshold = 0.):  # Pairs closer than it match
+        super().__init__()
+        self.backbone = backbone
+        self.distance_metric = distance_metric_module(distance_metric)
+        self.register_buffer('t', torch.as_tensor(threshold, dtype=torch.float).detach().clone().reshape(1))
+
+    def forward(self, x1: Tensor, x2: Tensor) -> Tuple[Tensor, Tensor]:
+        features = self.backbone(torch.cat([x1, x2])).flatten(start_dim=1)
+        f1, f2 = features[:x1.shape[0]], features[x1.shape[0]:]
+        distances = self.distance_metric(f1, f2)
+        return distances, distances < self.t
+
+# %% ../nbs/serving.ipynb 9
+class MicroBatcher:
+    """Processes concurrently submitted items in batches, formed within a latency deadline and processed in a worker"""
+    def __init__(self,
+                 process_batch: Callable[[list], list],  # Maps a list of items to a list of their results
+                 max_batch_size=64,
+                 max_latency=.005,  # Seconds the first item of a batch may wait for others to join it
+                 executor: Executor = None):  # Runs `process_batch`, e.g. a `ProcessPoolExecutor` if it's picklable. Defaults to a single worker thread
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._owns_executor = executor is None
+        self.n_batches = self.n_items = 0
+        self._queue = self._task = None
+        self._batch = []  # The batch being formed or processed
+
+    async def __aenter__(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Stops processing batches, failing the requests that are still queued or being processed"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        pending = self._batch + [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError('The micro-batcher was closed before processing the request'))
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)  # a batch being processed can't be interrupted, but isn't waited for
+
+    async def submit(self, item):
+        """The result of processing `item`, once its batch is processed"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put_nowait((item, future, loop.time()))
+        return await future
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        self._batch = batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_latency
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items, futures, _ = zip(*await self._next_batch())
+            try:
+                results = list(await loop.run_in_executor(self.executor, self.process_batch, list(items)))
+                if len(results) != len(items):
+                    raise ValueError(f'`process_batch` returned {len(results)} results for {len(items)} items')
+            except Exception as e:
+                results = [e] * len(futures)
+                set_results = [f.set_exception for f in futures]
+            else:
+                set_results = [f.set_result for f in futures]
+            self._batch = []
+            self.n_batches += 1
+            self.n_items += len(items)
+            for future, set_result, result in zip(futures, set_results, results):
+                if not future.done():  # e.g. cancelled by the client
+                    set_result(result)
+
+# %% ../nbs/serving.ipynb 14
+def _embed_batch(backbone: nn.Module, xs):
+    with torch.inference_mode():
+        return list(backbone(torch.stack(xs)).flatten(start_dim=1))
+
+
+class VerificationService:
+    """Verifies pairs, or probes against identities, with an `InferenceSiamese`, embedding concurrent requests in micro-batches"""
+    def __init__(self,
+                 model: InferenceSiamese,  # e.g. from `ThresholdSiamese.for_inference`
+                 cache_size=1024,  # Number of identities whose embeddings are kept (at least 1)
+                 **kwargs):  # Passed to `MicroBatcher`
+        if cache_size < 1: raise ValueError(f'`cache_size` must be at least 1, got {cache_size}')
+        self.model = model.eval()
+        self.embedder = MicroBatcher(partial(_embed_batch, self.model.backbone), **kwargs)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    async def __aenter__(self):
+        await self.embedder.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.embedder.__aexit__(*exc_info)
+
+    async def embed(self, x: Tensor, identity=None) -> Tensor:
+        """Embedding of the input `x`, cached for later requests if `identity` is passed (in which case `x` may be `None` if it's cached)"""
+        if identity is None:
+            return await self.embedder.submit(x)
+        if identity not in self._cache:
+            if x is None:
+                raise KeyError(f'Unknown identity: {identity}')
+            self._cache[identity] = asyncio.ensure_future(self.embedder.submit(x))  # concurrent requests share a single embedding
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        self._cache.move_to_end(identity)
+        embedding = self._cache[identity]
+        try:
+            return await asyncio.shield(embedding)  # a cancelled request doesn't cancel the others
+        except Exception:
+            if self._cache.get(identity) is embedding:
+                del self._cache[identity]
+            raise
+
+    async def enroll(self, identity, x: Tensor):
+        """Caches the embedding of `x` as `identity`, replacing its previous one"""
+        self._cache.pop(identity, None)
+        await self.embed(x, identity)
+
+    async def verify(self, x1: Tensor, x2: Tensor, identity1=None, identity2=None) -> Tuple[float, bool]:
+        """Distance between the inputs `x1` and `x2` (see `embed` for the identities), and whether they match"""
+        f1, f2 = await asyncio.gather(self.embed(x1, identity1), self.embed(x2, identity2))
+        distance = self.model.distance_metric(f1[None], f2[None])[0]
+        return distance.item(), bool(distance < self.model.t)
+
+    async def verify_probe(self, probe: Tensor, identity) -> Tuple[float, bool]:
+        """Verifies `probe` against an enrolled `identity`"""
+        return await self.verify(probe, None, identity2=identity)
+
+# %% ../nbs/serving.ipynb 20
+async def generate_load(send: Callable[[], Awaitable],  # Sends a single request, e.g. with a `VerificationService`
+                        rate: float,  # Mean requests per second
+                        n_requests=1000,
+                        seed=0) -> dict:
+    """Latency percentiles and throughput of `send`, called at Poisson-distributed times"""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    latencies = []
+
+    async def timed_send():
+        start = loop.time()
+        await send()
+        latencies.append(loop.time() - start)
+
+    start = send_time = loop.time()
+    requests = []
+    for _ in range(n_requests):
+        send_time += rng.expovariate(rate)
+        await asyncio.sleep(max(send_time - loop.time(), 0))
+        requests.append(asyncio.create_task(timed_send()))
+    await asyncio.gather(*requests)
+    latencies = torch.tensor(latencies) * 1000
+    return {'rate': rate,
+            'throughput': n_requests / (loop.time() - start),
+            'p50 (ms)': latencies.quantile(.5).item(),
+            'p99 (ms)': latencies.quantile(.99).item()}
@@ -1,7 +1,7 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/siamese.ipynb.
 
 # %% auto 0
-__all__ = ['normalized_squared_euclidean_distance', 'ContrastiveLoss', 'DistanceSiamese']
+__all__ = ['ContrastiveLoss', 'DistanceSiamese', 'normalized_squared_euclidean_distance_matrix', 'tiled_distance_matrix']
 
 # %% ../nbs/siamese.ipynb 3
 from torch import nn
@@ -9,17 +9,8 @@ from torch.nn.functional import normalize
 
 from fastai.vision.all import *
 
-
-def normalized_squared_euclidean_distance(x1, x2):
-    r"""
-    Squared Euclidean distance over normalized vectors:
-    $$\left\| \frac{x_1}{\|x_1\|}-\frac{x_2}{\|x_2\|} \right\|^2 $$
-    """
-    assert x1.dim() <= 2
-    assert x2.dim() <= 2
-    x1 = normalize(x1, dim=-1)
-    x2 = normalize(x2, dim=-1)
-    return (x1 - x2).pow(2).sum(dim=-1)
+from .profiling import record, count
+from .core import normalized_squared_euclidean_distance
 
 
 class ContrastiveLoss(BaseLoss):
@@ -36,13 +27,35 @@ class DistanceSiamese(Module):
     """Outputs the distance between two inputs in feature space"""
     def __init__(self, 
                  backbone: Module,  # embeds inputs in a feature space
-                 distance_metric = normalized_squared_euclidean_distance):
+                 distance_metric = normalized_squared_euclidean_distance,
+                 embedding_cache = None,  # e.g. an `EmbeddingCache`, used for embedding when not training and gradients are disabled
+                 shared_batch = False,  # Embed both sides of the pairs in a single backbone pass (except while training a batch-norm backbone, see `per_side_bn_stats`)
+                 per_side_bn_stats = True):  # When `shared_batch`, keep embedding each side in a separate pass while training a backbone with batch-norm layers, so their statistics are per side
         self.backbone = backbone
         self.distance_metric = distance_metric
+        self.embedding_cache = embedding_cache
+        self.shared_batch = shared_batch
+        self.per_side_bn_stats = per_side_bn_stats
 
     def forward(self, x):
-        f1, f2 = L(x).map(self.backbone).map(nn.Flatten())
-        return self.distance_metric(f1, f2)
+        x1, x2 = x
+        with record('backbone'):
+            if self.shared_batch and not (self.training and self.per_side_bn_stats and self._has_batch_norm()):
+                f1, f2 = self.embed(torch.cat([x1, x2])).split(len(x1))
+            else:
+                f1, f2 = self.embed(x1), self.embed(x2)
+        with record('distance'):
+            return self.distance_metric(f1, f2)
+
+    def embed(self, x):
+        """Embeds a batch of single inputs in feature space"""
+        count('embeddings', len(x))
+        if self.embedding_cache is not None and not self.training and not torch.is_grad_enabled():
+            return self.embedding_cache(self.backbone, x)
+        return self.backbone(x).flatten(start_dim=1)
+
+    def _has_batch_norm(self):
+        return any(isinstance(m, nn.modules.batchnorm._BatchNorm) for m in self.backbone.modules())
 
 
 # %% ../nbs/siamese.ipynb 4
@@ -50,8 +63,28 @@ from matplotlib.ticker import PercentFormatter
 from fastprogress.fastprogress import *
 import numpy as np
 
+from .utils import DistanceBuffer, DistanceHistogram
+from .profiling import record, count, profiled
+
+
+@patch
+def collect_distances(self: DistanceSiamese, dl: DataLoader, accumulator=None):
+    """Streams the distances of a dataloader of pairs, with their targets, into an accumulator (a new `DistanceBuffer` by default)"""
+    accumulator = accumulator if accumulator is not None else DistanceBuffer()
+    self.eval().to(dl.device)
+    with torch.no_grad():
+        for x, y in profiled(progress_bar(dl, leave=False)):
+            accumulator.update(self(x), y)
+            count('pairs', len(y))
+    return accumulator
+
+
 @patch
-def plot_distance_histogram(self: DistanceSiamese, pairs_dls: Union[TfmdDL, Dict[str, TfmdDL]], label='Distance'):
+def plot_distance_histogram(self: DistanceSiamese,
+                            pairs_dls: Union[TfmdDL, Dict[str, TfmdDL]],
+                            label='Distance',
+                            range=None,  # If passed, distances are counted in fixed bins within this range, in constant memory
+                            bins=10):
     """Plots a histogram of intra-class and inter-class distances"""    
     if isinstance(pairs_dls, DataLoader):
         pairs_dls = {
@@ -62,18 +95,88 @@ def plot_distance_histogram(self: DistanceSiamese, pairs_dls: Union[TfmdDL, Dict
     self.eval()
 
     with torch.no_grad():
-        for label, dl in pairs_dls.items():
-            self._hist(dl, label)
+        for dl_label, dl in pairs_dls.items():
+            self._hist(dl, dl_label, range, bins)
     
     plt.legend()
     plt.xlabel(label)
 
 
 @patch
-def _hist(self: DistanceSiamese, dl, label):
-    self.to(dl.device)
-    processed_batches = [self(x) for x, _ in progress_bar(dl, leave=False)]
-    distances = torch.cat(processed_batches).cpu().numpy()
-    weights = np.ones_like(distances) / len(distances)  # normalization for percentage ticks
-    plt.hist(distances, label=label, alpha=.5, edgecolor='black', lw=1, weights=weights)
+def _hist(self: DistanceSiamese, dl, label, range=None, bins=10):
+    if range is None:
+        distances = self.collect_distances(dl).distances.numpy()
+        weights = np.ones_like(distances) / len(distances)  # normalization for percentage ticks
+    else:
+        hist = self.collect_distances(dl, DistanceHistogram(bins, range))
+        counts = hist.counts.sum(0).numpy()
+        distances, bins = hist.edges[:-1].numpy(), hist.edges.numpy()  # each bin is plotted as a single weighted point
+        weights = counts / counts.sum()
+    with record('plotting'):
+        plt.hist(distances, bins=bins, label=label, alpha=.5, edgecolor='black', lw=1, weights=weights)
     plt.gca().yaxis.set_major_formatter(PercentFormatter(1))
+
+# %% ../nbs/siamese.ipynb 20
+def normalized_squared_euclidean_distance_matrix(x1, x2):
+    """Matrix form of `normalized_squared_euclidean_distance`, between each row of `x1` and each row of `x2`"""
+    x1 = normalize(x1, dim=-1)
+    x2 = normalize(x2, dim=-1)
+    return (2 - 2 * x1 @ x2.T).clamp_(min=0)
+
+
+_matrix_forms = {normalized_squared_euclidean_distance: normalized_squared_euclidean_distance_matrix}
+
+def _broadcast_matrix_form(distance_metric, max_elements):
+    """Applies a metric of pairs of rows to all pairs, in chunks of `x1` rows whose broadcast pairs have at most `max_elements` values"""
+    def matrix_form(x1, x2):
+        chunk_size = max(max_elements // max(x2.numel(), 1), 1)
+        return torch.cat([distance_metric(c.repeat_interleave(len(x2), dim=0), x2.repeat(len(c), 1)).view(len(c), len(x2))
+                          for c in x1.split(chunk_size)])
+    return matrix_form
+
+
+def tiled_distance_matrix(x1: Tensor,  # Embeddings of shape `(n1, d)`
+                          x2: Tensor,  # Embeddings of shape `(n2, d)`
+                          distance_metric=normalized_squared_euclidean_distance,
+                          k: int = None,  # If passed, only the distances to the `k` nearest rows of `x2` are returned, with their indices
+                          tile_size=4096,  # Distances are computed in tiles of at most `tile_size`x`tile_size`, which bounds the memory usage
+                          dtype=None,  # Computation dtype, e.g. `torch.bfloat16` for faster (but less accurate) computation. `torch.float16` is only supported on GPUs
+                          max_elements=2**24  # For metrics without a matrix form, the most values of broadcast pairs materialized at once
+                          ):
+    """Distances between each row of `x1` and each row of `x2`, computed in tiles"""
+    matrix_form = _matrix_forms.get(distance_metric) or _broadcast_matrix_form(distance_metric, max_elements)
+    if dtype == torch.float16 and 'cpu' in {x1.device.type, x2.device.type}:
+        raise ValueError('float16 distances are only supported on GPUs, use `dtype=torch.bfloat16` on CPU instead')
+    if dtype is not None:
+        x1, x2 = x1.to(dtype), x2.to(dtype)
+    if k is None:
+        return torch.cat([torch.cat([matrix_form(t1, t2).float() for t2 in x2.split(tile_size)], dim=1)
+                          for t1 in x1.split(tile_size)])
+
+    k = min(k, len(x2))
+    all_distances, all_idxs = [], []
+    for t1 in x1.split(tile_size):
+        distances, idxs = t1.new_empty(len(t1), 0, dtype=torch.float), torch.empty(len(t1), 0, dtype=torch.long, device=t1.device)
+        for start in range(0, len(x2), tile_size):
+            tile = matrix_form(t1, x2[start:start+tile_size]).float()
+            tile_idxs = torch.arange(start, start + tile.shape[1], device=t1.device).expand_as(tile)
+            distances, nearest = torch.cat([distances, tile], dim=1).topk(k, dim=1, largest=False)
+            idxs = torch.cat([idxs, tile_idxs], dim=1).gather(1, nearest)
+        all_distances.append(distances)
+        all_idxs.append(idxs)
+    return torch.cat(all_distances), torch.cat(all_idxs)
+
+# %% ../nbs/siamese.ipynb 24
+@patch
+def embed_all(self: DistanceSiamese, x: Tensor, bs=256) -> Tensor:
+    """Embeds a (possibly large) tensor of single inputs in batches"""
+    self.eval()
+    with torch.no_grad():
+        return torch.cat([self.embed(b) for b in x.split(bs)])
+
+
+@patch
+@delegates(tiled_distance_matrix, but=['distance_metric'])
+def distance_matrix(self: DistanceSiamese, f1, f2, **kwargs):
+    """Distances between each pair of embeddings (e.g. from `DistanceSiamese.embed_all`) using `distance_metric`"""
+    return tiled_distance_matrix(f1, f2, self.distance_metric, **kwargs)
@@ -1,7 +1,9 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/utils.ipynb.
 
 # %% auto 0
-__all__ = ['as_percentage', 'cut_model_by_name', 'MLP', 'Threshold', 'ExperimentalResults', 'RepeatedExperiment']
+__all__ = ['as_percentage', 'cut_model_by_name', 'MLP', 'sorted_cuts', 'DistanceHistogram', 'DistanceBuffer',
+           'ExperimentalResults', 'RepeatedExperiment', 'precompute_features', 'load_features', 'features_dsets',
+           'pair_features_dsets']
 
 # %% ../nbs/utils.ipynb 3
 from fastai.vision.all import *
@@ -15,9 +17,12 @@ def as_percentage(x, ndigits=2):
 
 # %% ../nbs/utils.ipynb 5
 def cut_model_by_name(model, cut):
+    """A `GraphModule` computing `model` up to (and including) the layer named `cut`, as a proper (scriptable) module"""
     graph = create_feature_extractor(model, [cut])
-    base_forward = graph.forward
-    graph.forward = lambda *args, **kwargs: base_forward(*args, **kwargs)[cut]
+    for g in {graph.train_graph, graph.eval_graph}:  # the extractor switches between them on `train()`/`eval()`
+        output = next(n for n in g.nodes if n.op == 'output')
+        output.args = (output.args[0][cut],)  # return the tensor instead of a dict of it
+    graph.recompile()
     return graph
 
 # %% ../nbs/utils.ipynb 7
@@ -51,7 +56,7 @@ class MLP(Module):
     def forward(self, x):
         x = x.flatten(start_dim=1)
         x = self.hidden_layers(x)
-        if self.logits:
+        if self.logits is not None:
             x = self.logits(x)
         return x
 
@@ -61,43 +66,194 @@ from torch import nn
 
 from fastai.vision.all import *
 
-class Threshold(nn.Module):
-    """Classifies 1D inputs into 2 classes, based on whether they surpass a threshold or not"""
-    def __init__(self) -> None:
-        super().__init__()
-        self.t = nn.Parameter(torch.zeros(1))
-
-    def forward(self, x):
-        x = x - self.t
-        return torch.stack([x, -x], dim=-1)
+from .core import Threshold
 
 # %% ../nbs/utils.ipynb 11
+def sorted_cuts(x, y, dtype=torch.float32):
+    """Sorts `x` once, and for each cut between distinct values returns a threshold and the positives/negatives below it"""
+    x, order = x.flatten().to(dtype).sort()
+    y = y.flatten().bool()[order]
+    tp = F.pad(y.cumsum(0), (1, 0))  # number of positives strictly below each cut
+    fp = F.pad((~y).cumsum(0), (1, 0))
+
+    lo, hi = torch.cat([x[:1], x]), torch.cat([x, x[-1:]])
+    mid = (lo + hi) / 2
+    thresholds = torch.where(mid > lo, mid, hi)  # midpoints might round down to `lo` for adjacent floats
+    thresholds[-1] = torch.nextafter(x[-1], x.new_tensor(float('inf')))
+
+    is_cut = torch.ones_like(tp, dtype=torch.bool)
+    is_cut[1:-1] = x[1:] != x[:-1]
+    return thresholds[is_cut], tp[is_cut], fp[is_cut]
+
+
+def _best_cut(tp, fp, n_pos, n_neg, objective='accuracy', target_rate=None):
+    """Index of the best cut given the cumulative counts below each cut, and the score of that cut"""
+    assert objective not in {'far', 'frr'} or target_rate is not None, f'`target_rate` is required for "{objective}"'
+    tp, fp = tp.double(), fp.double()
+    tpr, fpr = tp / max(n_pos, 1), fp / max(n_neg, 1)
+    if objective == 'accuracy':
+        scores = (tp + n_neg - fp) / (n_pos + n_neg)
+    elif objective == 'balanced_accuracy':
+        scores = (tpr + 1 - fpr) / 2
+    elif objective == 'far':  # maximize the true accept rate while keeping the false accept rate under `target_rate`
+        scores = torch.where(fpr <= target_rate, tpr, tpr.new_tensor(-1.))
+    elif objective == 'frr':  # maximize the true reject rate while keeping the false reject rate under `target_rate`
+        scores = torch.where(1 - tpr <= target_rate, 1 - fpr, fpr.new_tensor(-1.))
+    else:
+        raise ValueError(f'Unknown objective: {objective}')
+
+    i = scores.argmax()
+    return i, scores[i].item()
+
+# %% ../nbs/utils.ipynb 12
 @patch
-def fit(self: Threshold, x, y):
-    """Picks a threshold that maximizes the empirical accuracy"""
+def fit(self: Threshold,
+        x,  # 1D inputs, e.g. distances
+        y,  # Binary targets, where 1 means the input should fall below the threshold
+        objective='accuracy',  # One of "accuracy", "balanced_accuracy", "far" or "frr"
+        target_rate=None  # The maximal false accept/reject rate, when `objective` is "far"/"frr"
+        ):
+    """Picks the threshold that maximizes `objective` on the empirical data"""
+    if x.numel() == 0:
+        raise ValueError("Can't fit a threshold without any inputs")
     with torch.no_grad():
-        def accuracy_for_threshold(t):
-            self.t[0] = t
-            return accuracy(self(x), y)
+        y = y.flatten().bool()
+        thresholds, tp, fp = sorted_cuts(x, y, self.t.dtype)
+        i, score = _best_cut(tp, fp, y.sum().item(), (~y).sum().item(), objective, target_rate)
+        self.t[0] = thresholds[i]
+        return self.t.item(), score
+
+# %% ../nbs/utils.ipynb 18
+class DistanceHistogram:
+    """Per-class counts of 1D inputs in fixed bins, accumulated batch by batch in constant memory"""
+    def __init__(self,
+                 bins=4096,  # Number of equal-width bins
+                 range=(0., 4.)  # Inputs outside the range are counted separately, as below/above all the edges
+                 ):
+        self.edges = torch.linspace(*range, bins + 1, dtype=torch.float64)
+        self.counts = torch.zeros(2, bins, dtype=torch.long)  # Negatives, positives
+        self.underflow = torch.zeros(2, dtype=torch.long)
+        self.overflow = torch.zeros(2, dtype=torch.long)
+
+    def update(self, x, y):
+        """Adds a batch of inputs `x` with binary targets `y`"""
+        bin_idxs = torch.bucketize(x.detach().flatten().double().cpu(), self.edges, right=True)  # 0 below the range, `bins + 1` above it
+        n_bins = len(self.edges) + 1
+        counts = torch.bincount(y.detach().flatten().long().cpu() * n_bins + bin_idxs, minlength=2 * n_bins).view(2, n_bins)
+        self.underflow += counts[:, 0]
+        self.counts += counts[:, 1:-1]
+        self.overflow += counts[:, -1]
+        return self
 
-        threshold_candidates = np.arange(0.0, 4.0, 0.01)
-        self.t[0], accuracy_score = max(((t, accuracy_for_threshold(t)) for t in threshold_candidates),
-                                                key=lambda p: p[1])
+    @property
+    def totals(self) -> Tensor:
+        """Number of negatives and positives, including the ones outside the range"""
+        return self.underflow + self.counts.sum(1) + self.overflow
 
-        return self.t.item(), accuracy_score.item()
+    def cumulative_counts(self) -> Tensor:
+        """Number of negatives and positives below each edge"""
+        return F.pad(self.counts.cumsum(1), (1, 0)) + self.underflow[:, None]
 
 
-# %% ../nbs/utils.ipynb 15
+@patch
+def fit_histogram(self: Threshold, hist: DistanceHistogram, objective='accuracy', target_rate=None):
+    """Like `Threshold.fit`, but picks one of the edges of a `DistanceHistogram`"""
+    (n_neg, n_pos), (fp, tp) = hist.totals.tolist(), hist.cumulative_counts()
+    if n_neg + n_pos == 0:
+        raise ValueError("Can't fit a threshold to an empty histogram")
+    with torch.no_grad():
+        i, score = _best_cut(tp, fp, n_pos, n_neg, objective, target_rate)
+        self.t[0] = hist.edges[i]
+        return self.t.item(), score
+
+# %% ../nbs/utils.ipynb 21
+class DistanceBuffer:
+    """Growable buffer of 1D inputs and their binary targets, stored in memory or in memory-mapped files"""
+    def __init__(self,
+                 capacity=65536,  # Initial capacity, doubled whenever it's exceeded
+                 path=None  # If passed, the inputs and targets are stored in memory-mapped files with this path prefix
+                 ):
+        self.path, self.n = path, 0
+        self._distances = self._allocate('distances', np.float32, capacity)
+        self._targets = self._allocate('targets', np.bool_, capacity)
+
+    def _allocate(self, name, dtype, capacity, prev=None):
+        if self.path is None:
+            buffer = np.empty(capacity, dtype)
+            if prev is not None:
+                buffer[:len(prev)] = prev
+            return buffer
+        fname = f'{self.path}.{name}'
+        if prev is None:
+            return np.memmap(fname, dtype, mode='w+', shape=(capacity,))
+        prev.flush()
+        with open(fname, 'r+b') as f:  # Extending the file keeps the existing values in place
+            f.truncate(capacity * np.dtype(dtype).itemsize)
+        return np.memmap(fname, dtype, mode='r+', shape=(capacity,))
+
+    def update(self, x, y):
+        """Appends a batch of inputs `x` with binary targets `y`"""
+        x, y = x.detach().flatten().float().cpu().numpy(), y.detach().flatten().bool().cpu().numpy()
+        capacity = len(self._distances)
+        if self.n + len(x) > capacity:
+            while self.n + len(x) > capacity:
+                capacity *= 2
+            self._distances = self._allocate('distances', np.float32, capacity, self._distances)
+            self._targets = self._allocate('targets', np.bool_, capacity, self._targets)
+        self._distances[self.n:self.n+len(x)] = x
+        self._targets[self.n:self.n+len(x)] = y
+        self.n += len(x)
+        return self
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def distances(self) -> Tensor:
+        return torch.from_numpy(self._distances[:self.n])
+
+    @property
+    def targets(self) -> Tensor:
+        return torch.from_numpy(self._targets[:self.n])
+
+    def histogram(self,
+                  bins=65536,  # Number of equal-width bins between the smallest and largest inputs
+                  chunk_size=2**20  # Number of inputs read at a time, so memory-mapped inputs are never loaded at once
+                  ) -> DistanceHistogram:
+        """Counts the inputs in a `DistanceHistogram` spanning their range, chunk by chunk"""
+        chunks = [slice(i, min(i + chunk_size, self.n)) for i in range(0, self.n, chunk_size)]
+        lo = min((float(self._distances[c].min()) for c in chunks), default=0.)
+        hi = max((float(self._distances[c].max()) for c in chunks), default=0.)
+        hist = DistanceHistogram(bins, (lo, float(np.nextafter(np.float32(hi), np.float32(np.inf)))))  # the largest input is below the last edge
+        for c in chunks:
+            hist.update(torch.from_numpy(self._distances[c]), torch.from_numpy(self._targets[c]))
+        return hist
+
+# %% ../nbs/utils.ipynb 25
+import time
+import traceback
+import multiprocessing
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
 
 import matplotlib.pyplot as plt
+
+from .profiling import profiling, record
     
 
 @dataclass
 class ExperimentalResults(object):
     "Provides various ways of examining the results of a `RepeatedExperiment`"
     stats: List[Any]
+    times: List[float] = field(default_factory=list)  # Duration (in seconds) of each iteration in `stats`
+    failures: Dict[int, str] = field(default_factory=dict)  # Tracebacks of failed iterations, by iteration index
+    iterations: List[int] = None  # Index of the iteration of each item in `stats` (failed iterations are skipped). Defaults to consecutive indices
+
+    def __post_init__(self):
+        if self.iterations is None:
+            self.iterations = list(range(len(self.stats)))
 
     @property
     def collated_stats(self):
@@ -113,7 +269,8 @@ class ExperimentalResults(object):
             val_range = max_val - min_val
             ax.set_ylim(min_val - .1*val_range, max_val + .1*val_range)
             
-            ax.bar(range(len(stat_values)), stat_values)
+            ax.bar(self.iterations, stat_values)
+        axs[-1].set_xticks(self.iterations)
 
     @property
     def stat_means(self):
@@ -130,28 +287,182 @@ class RepeatedExperiment(ABC):
     def __init__(self,
                  model: nn.Module,  # The model to be used in each iteration. Parameter are reset to their initial values before each iteration
                  data: List[Datasets],  # A list of `Datasets`, each representing a different iteration. A `Dataloaders` of the current `Datasets` is available via `self.dls`
-                 seed: int = 0  # Used for reproducibility of results. Use `None` to avoid reproducibility
+                 seed: int = 0,  # Used for reproducibility of results (iteration `i` uses `seed + i`, see below). Use `None` to avoid reproducibility
+                 n_workers: int = 0,  # Number of iterations to run in parallel, each on its own copy of the model. Use 0 to run them one after another
+                 executor: str = 'process',  # Whether parallel iterations run in forked processes or in threads (the fallback where forking isn't supported, which isn't reproducible and loads data in the main process)
+                 frozen_feature_extractor: nn.Module = None,  # A submodule of `model` that isn't trained. If passed, inputs are embedded with it once, and all iterations run on the precomputed features
+                 profile: bool = False  # Profile each iteration (see `profiling`), adding the time spent in each section (0 for sections it skipped), throughput and peak memory to its stats
                  ):
         super().__init__()
-        store_attr('model, data, seed')
+        store_attr('model, data, seed, n_workers, executor, frozen_feature_extractor, profile')
     
     def run(self) -> ExperimentalResults:
         "Runs the experiment, returning the results as an `ExperimentalResults`"
-        return ExperimentalResults(self._run())
+        stats, times, failures, iterations = [], [], {}, []
+        for i, (iteration_stats, duration, error) in enumerate(self._run()):
+            if error is not None:
+                warn(f'Iteration {i} failed:\n{error}')
+                failures[i] = error
+            else:
+                stats.append(iteration_stats)
+                times.append(duration)
+                iterations.append(i)
+        if self.profile:  # iterations might go through different profiled sections, which took no time in the others
+            keys = list(dict.fromkeys(k for s in stats for k in s))
+            stats = [{k: s.get(k, 0.) for k in keys} for s in stats]
+        return ExperimentalResults(stats, times, failures, iterations)
 
     @return_list
     def _run(self):
+        with self._precomputed_features():
+            yield from self._run_iterations()
+
+    @contextmanager
+    def _precomputed_features(self):
+        "Replaces the frozen feature extractor (if any) with features precomputed over the data of all iterations"
+        self.iteration_data = self.data
+        if self.frozen_feature_extractor is None:
+            yield
+            return
+
+        features = []
+        for dsets in progress_bar(self.data, leave=False):
+            # The same items (e.g. LFW pairs) are usually split differently in each iteration, so are only embedded once
+            prev_features = first(f for d, f in zip(self.data, features) if _same_items(d.items, dsets.items))
+            features.append(prev_features if prev_features is not None else precompute_features(dsets, self.frozen_feature_extractor))
+        self.iteration_data = [features_dsets(d, f) for d, f in zip(self.data, features)]
+        with _replaced_module(self.model, self.frozen_feature_extractor, nn.Identity()):
+            yield
+
+    def _run_iterations(self):
+        if self.n_workers == 0:
+            initial_state_dict = deepcopy(self.model.state_dict())
+            for i in master_bar(range_of(self.data)):
+                yield self._try_iteration(i)
+                self.model.load_state_dict(initial_state_dict)
+            return
+
+        executor = self.executor
+        if executor == 'process' and 'fork' not in multiprocessing.get_all_start_methods():  # e.g. on Windows
+            warn("Forked processes aren't supported on this platform, running the iterations in threads instead")
+            executor = 'thread'
+        if executor == 'thread':
+            pool = ThreadPoolExecutor(self.n_workers)
+            # Dataloader worker processes would be forked from a multi-threaded process, and their exit signals raise in the main thread
+            futures = [pool.submit(self._try_iteration_on_copy, i, num_workers=0) for i in range_of(self.data)]
+        else:
+            global _forked_experiment
+            _forked_experiment = self  # Inherited by the forked workers, since `data` might not be picklable
+            pool = ProcessPoolExecutor(self.n_workers, mp_context=multiprocessing.get_context('fork'),
+                                       initializer=torch.set_num_threads, initargs=(max(1, torch.get_num_threads() // self.n_workers),))
+            futures = [pool.submit(_try_forked_iteration, i) for i in range_of(self.data)]
+        with pool:
+            for future in progress_bar(futures):
+                while not future.done():
+                    try:
+                        wait([future])
+                    except Exception:  # raised in this thread while waiting (e.g. by a signal handler), rather than by the iteration
+                        pass
+                error = future.exception()  # the worker itself failed (e.g. a process killed for running out of memory), failing its unfinished iterations
+                yield future.result() if error is None else (None, 0., ''.join(traceback.format_exception(error)))
+
+    def _try_iteration(self, i, **dls_kwargs):
+        "Runs the `i`th iteration, returning its stats, its duration and its traceback (if it failed)"
         if self.seed is not None:
-            set_seed(self.seed, reproducible=True)
-
-        initial_state_dict = deepcopy(self.model.state_dict())
-
-        splits = master_bar(self.data)
-        for i, split in enumerate(splits):
-            self.dls = split.dls()
-            yield self.iteration()
-            self.model.load_state_dict(initial_state_dict)
+            set_seed(self.seed + i, reproducible=True)
+        start = time.perf_counter()
+        try:
+            self.dls = self.iteration_data[i].dls(**dls_kwargs)
+            with profiling() if self.profile else nullcontext() as profiler:
+                stats = self.iteration()
+            if profiler is not None:
+                stats = {**stats, **profiler.stats}
+            return stats, time.perf_counter() - start, None
+        except Exception:
+            return None, time.perf_counter() - start, traceback.format_exc()
+
+    def _try_iteration_on_copy(self, i, **dls_kwargs):
+        experiment = copy(self)
+        experiment.model = deepcopy(self.model)
+        return experiment._try_iteration(i, **dls_kwargs)
 
     @abstractmethod
     def iteration(self) -> Dict[str, Any]:
         pass
+
+
+def _same_items(items, other):
+    "Whether `items` and `other` are the same object, or equal item by item (including tensors, arrays and lists of them)"
+    if items is other:
+        return True
+    try:
+        return len(items) == len(other) and bool(equals(items, other))
+    except Exception:  # e.g. items of different shapes, which are then embedded separately
+        return False
+
+
+_forked_experiment = None
+
+def _try_forked_iteration(i):
+    return _forked_experiment._try_iteration_on_copy(i)
+
+# %% ../nbs/utils.ipynb 42
+def _inputs(x):
+    return x if is_listy(x) else (x,)
+
+
+def precompute_features(dsets: Datasets,
+                        feature_extractor: nn.Module,
+                        bs=64,
+                        path=None  # If passed, features are written to a memory-mapped `.npy` file with this path (see `load_features`) instead of kept in memory
+                        ) -> Tensor:
+    """Embeds each input of each item in `dsets` (e.g. both sides of a pair), returning a tensor of shape `(len(dsets), n_inputs, *features_shape)`"""
+    if len(dsets) == 0:
+        raise ValueError("Can't precompute the features of an empty dataset, whose shape is unknown")
+    dl = dsets.dl(bs=bs)
+    feature_extractor.eval().to(dl.device)
+    with torch.no_grad(), record('feature precomputation'):
+        batches = (torch.stack([feature_extractor(x) for x in _inputs(b[0])], dim=1).cpu() for b in progress_bar(dl, leave=False))
+        if path is None:
+            return torch.cat(list(batches))
+
+        features, start = None, 0
+        for batch in batches:
+            if features is None:
+                features = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(len(dsets), *batch.shape[1:]))
+            features[start:start+len(batch)] = batch.float().numpy()
+            start += len(batch)
+        features.flush()
+    return load_features(path)
+
+
+def load_features(path) -> Tensor:
+    """Features written by `precompute_features`, memory-mapped from disk (without copying them into memory)"""
+    return torch.from_numpy(np.load(path, mmap_mode='c'))  # copy-on-write, so the file is never modified
+
+
+def features_dsets(dsets: Datasets, features: Tensor) -> Datasets:
+    """A `Datasets` with the same targets and splits as `dsets`, whose inputs are the precomputed `features` of its items"""
+    def get_x(i):
+        return fastuple(features[i].unbind()) if features.shape[1] > 1 else features[i, 0]
+    return Datasets(tls=[TfmdLists(range_of(dsets), get_x, splits=dsets.splits), *dsets.tls[dsets.n_inp:]])
+
+
+def pair_features_dsets(pairs: Datasets, features: Tensor) -> Datasets:
+    """Like `features_dsets` for `pairs` whose items are pairs of indices of single items (as in `Pairs`), given the `features` of the single items"""
+    def get_x(o):
+        return fastuple(features[o[0], 0], features[o[1], 0])
+    return Datasets(tls=[TfmdLists(pairs.items, get_x, splits=pairs.splits), *pairs.tls[pairs.n_inp:]])
+
+
+@contextmanager
+def _replaced_module(model: nn.Module, old: nn.Module, new: nn.Module):
+    name = first(n for n, m in model.named_modules() if m is old)
+    assert name, 'Expected a submodule of `model`'
+    parent_name, _, attr = name.rpartition('.')
+    parent = model.get_submodule(parent_name)
+    setattr(parent, attr, new)
+    try:
+        yield
+    finally:
+        setattr(parent, attr, old)